@@ -1,20 +1,22 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import asyncio
+import pyarrow as pa
+import csv
+import hashlib
+import html
+import io
+import itertools
+import jinja2
 import json
+import orjson
 from datetime import datetime
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
+from types import MappingProxyType
 
 from services.ai_platforms import AIPlatformManager
 from services.prompt_generator import PromptGenerator
 from services.brand_analyzer import BrandAnalyzer
 from services.competitor_analyzer import CompetitorAnalyzer
 from services.visibility_scorer import VisibilityScorer
+from utils.response_cache import ResponseCache
 from config.industries import INDUSTRIES
 
 # Page configuration
@@ -25,6 +27,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Badge colors and display names per platform, shared across reruns
+PLATFORM_META = MappingProxyType({
+    'openai': {'bg': '#10B981', 'name': 'ChatGPT'},
+    'gemini': {'bg': '#3B82F6', 'name': 'Google Gemini'},
+    'perplexity': {'bg': '#8B5CF6', 'name': 'Perplexity AI'},
+    'copilot': {'bg': '#0078D4', 'name': 'Microsoft Copilot'},
+    'meta': {'bg': '#0866FF', 'name': 'Meta AI'}
+})
+PLATFORM_CHART_COLORS = {platform.upper(): meta['bg'] for platform, meta in PLATFORM_META.items()}
+
 # Initialize session state
 if 'analysis_complete' not in st.session_state:
     st.session_state.analysis_complete = False
@@ -33,9 +45,74 @@ if 'analysis_data' not in st.session_state:
 if 'brand_profile' not in st.session_state:
     st.session_state.brand_profile = None
 
-def apply_custom_css():
-    """Apply custom CSS for professional SaaS-like appearance"""
-    st.markdown("""
+# Service singletons - created once per server process and shared across reruns
+@st.cache_resource
+def get_prompt_generator():
+    return PromptGenerator()
+
+@st.cache_resource
+def get_ai_manager():
+    return AIPlatformManager()
+
+@st.cache_resource
+def get_brand_analyzer():
+    return BrandAnalyzer()
+
+@st.cache_resource
+def get_competitor_analyzer():
+    return CompetitorAnalyzer(get_brand_analyzer())
+
+@st.cache_resource
+def get_visibility_scorer():
+    return VisibilityScorer()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def generate_prompts_cached(industry, count, location, is_custom):
+    """Generate prompts, reusing the last result for an identical industry/location setup"""
+    return get_prompt_generator().generate_prompts(
+        industry,
+        count,
+        location=location,
+        is_custom=is_custom
+    )
+
+@st.cache_resource
+def get_response_cache():
+    # Responses are kept on disk so paid API calls survive server restarts
+    return ResponseCache()
+
+def profile_hash(profile):
+    """Stable digest of a brand profile, used to skip re-running identical analyses"""
+    return hashlib.blake2b(json.dumps(profile, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+def analysis_digest(analysis_data):
+    """Stable digest of analysis results, used as the cache key for derived tables and charts"""
+    content = {key: value for key, value in analysis_data.items() if key not in ('comparison', 'timestamp')}
+    payload = orjson.dumps(content, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+def build_entity_comparison(brand_name, brand_analysis, competitor_analysis, competitors):
+    """Build the brand-vs-competitors table once so every tab can reuse it"""
+    entities = [(brand_name, brand_analysis['total_mentions'], brand_analysis['average_ranking'] or 0,
+                 brand_analysis['platform_mentions'])]
+    for competitor in competitors:
+        comp_data = competitor_analysis.get(competitor, {})
+        entities.append((competitor, comp_data.get('total_mentions', 0), comp_data.get('average_ranking', 0),
+                         comp_data.get('platform_mentions', {})))
+    
+    # Build column-wise from parallel lists rather than one dict per row
+    names, totals, rankings, platform_mentions = zip(*entities)
+    return pa.table({
+        'Entity': names,
+        'Total Mentions': totals,
+        'Average Ranking': rankings,
+        'OpenAI Mentions': [mentions.get('openai', 0) for mentions in platform_mentions],
+        'Gemini Mentions': [mentions.get('gemini', 0) for mentions in platform_mentions],
+        'Perplexity Mentions': [mentions.get('perplexity', 0) for mentions in platform_mentions]
+    })
+
+# Custom CSS, with indentation and blank lines stripped once at import
+_CUSTOM_CSS = "\n".join(line.strip() for line in """
     <style>
     /* Main container styling */
     .main {
@@ -75,6 +152,12 @@ def apply_custom_css():
         transition: transform 0.2s, box-shadow 0.2s;
     }
     
+    .metric-row {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
+        gap: 1rem;
+    }
+    
     .metric-card:hover {
         transform: translateY(-2px);
         box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
@@ -207,7 +290,55 @@ def apply_custom_css():
     
     /* Copilot and Meta styles removed - platforms disabled */
     </style>
-    """, unsafe_allow_html=True)
+""".splitlines() if line.strip())
+
+# Metric card row template, compiled once; values are HTML-escaped on render.
+# Kept on a single line so markdown never treats indented HTML as a code block.
+_METRIC_ROW = jinja2.Environment(autoescape=True).from_string(
+    '<div class="metric-row">{% for card in cards %}'
+    '<div class="metric-card">'
+    '<h5 style="color: #6B7280; margin: 0;">{{ card.title }}</h5>'
+    '<{{ card.value_tag }} style="color: {{ card.value_color }}; margin: 0.5rem 0;">{{ card.value }}</{{ card.value_tag }}>'
+    '<p style="color: #9CA3AF; font-size: 0.875rem;">{{ card.caption }}</p>'
+    '</div>'
+    '{% endfor %}</div>'
+)
+
+def metric_card(title, value, caption, value_tag="h2", value_color="#1F2937"):
+    """Describe one metric card for metric_row"""
+    return {
+        'title': title,
+        'value': value,
+        'caption': caption,
+        'value_tag': value_tag,
+        'value_color': value_color
+    }
+
+def render_metric_row(cards):
+    """Render a row of metric cards to HTML"""
+    return _METRIC_ROW.render(cards=cards)
+
+def metric_row(cards):
+    """Emit a row of metric cards as one markdown element instead of one per column"""
+    st.markdown(render_metric_row(cards), unsafe_allow_html=True)
+
+# Platform tab snippets, filled with str.format_map; callers escape the values
+_PLATFORM_BADGE = (
+    '<div style="margin: 1.5rem 0;">'
+    '<span class="platform-badge" style="background: {bg}; font-size: 1rem; padding: 0.5rem 1rem;">{name}</span>'
+    '</div>'
+)
+_SAMPLE_CARD = (
+    '<div class="metric-card" style="margin-bottom: 1rem;">'
+    '<p style="color: #6366F1; font-weight: 500; margin-bottom: 0.5rem;">Query: {prompt}</p>'
+    '<p style="color: #4B5563; line-height: 1.6;">{response}...</p>'
+    '</div>'
+)
+
+def apply_custom_css():
+    """Apply custom CSS for professional SaaS-like appearance"""
+    # Streamlit drops elements a rerun doesn't emit, so this runs every rerun
+    st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
 
 def main():
     apply_custom_css()
@@ -322,8 +453,7 @@ def main():
             elif not platforms:
                 st.error("Please select at least one AI platform")
             else:
-                # Store brand profile
-                st.session_state.brand_profile = {
+                profile = {
                     'brand_name': brand_name,
                     'industry': industry,
                     'is_custom_industry': industry not in predefined_industries,
@@ -332,7 +462,15 @@ def main():
                     'prompt_count': prompt_count,
                     'platforms': platforms
                 }
-                run_analysis()
+                
+                # Results for an unchanged profile are already on screen
+                if (st.session_state.analysis_complete and st.session_state.analysis_data and
+                        st.session_state.get('last_profile_hash') == profile_hash(profile)):
+                    st.info("Showing results for the unchanged brand profile")
+                else:
+                    # Store brand profile
+                    st.session_state.brand_profile = profile
+                    run_analysis()
 
     # Main content area
     if st.session_state.brand_profile is None:
@@ -429,99 +567,100 @@ def run_analysis():
         try:
             profile = st.session_state.brand_profile
             
-            # Initialize services
-            prompt_generator = PromptGenerator()
-            ai_manager = AIPlatformManager()
-            brand_analyzer = BrandAnalyzer()
-            competitor_analyzer = CompetitorAnalyzer()
-            visibility_scorer = VisibilityScorer()
+            # Step messages share one placeholder so they can be cleared without a rerun
+            step = st.empty()
+            status_slot = st.empty()
+            
+            # Get shared service instances
+            brand_analyzer = get_brand_analyzer()
+            competitor_analyzer = get_competitor_analyzer()
+            visibility_scorer = get_visibility_scorer()
             
             # Generate prompts
-            st.info("🔄 Generating industry-specific prompts...")
-            prompts = prompt_generator.generate_prompts(
+            step.info("🔄 Generating industry-specific prompts...")
+            prompts = generate_prompts_cached(
                 profile['industry'], 
                 profile['prompt_count'],
-                location=profile.get('location'),
-                is_custom=profile.get('is_custom_industry', False)
+                profile.get('location'),
+                profile.get('is_custom_industry', False)
             )
             
             # Query AI platforms with concurrency
-            st.info("🔄 Querying AI platforms concurrently...")
-            all_responses = {}
-            total_queries = len(profile['platforms']) * len(prompts)
-            completed_queries = 0
-            progress_bar = st.progress(0)
-            progress_text = st.empty()
-            
-            # Thread-safe counter
-            lock = threading.Lock()
-            
-            def query_single_prompt(platform, prompt):
-                """Query a single prompt on a platform"""
-                response = ai_manager.query_platform(platform, prompt)
-                return platform, prompt, response
+            status = status_slot.status("🔄 Querying AI platforms concurrently...", expanded=True)
+            ai_manager = get_ai_manager()
+            response_cache = get_response_cache()
+            all_responses = {platform: [None] * len(prompts) for platform in profile['platforms']}
+            # Identical prompts are queried once and fanned back out to each of their slots
+            prompt_slots = {}
+            for index, prompt in enumerate(prompts):
+                prompt_slots.setdefault(prompt, []).append(index)
+            total_queries = len(profile['platforms']) * len(prompt_slots)
+            completed_counter = itertools.count(1)
+            progress_step = max(1, total_queries // 100)  # Redraw at most ~100 times
+            with status:
+                progress_bar = st.progress(0)
+                progress_text = st.empty()
             
             def update_progress():
-                """Update progress bar in thread-safe manner"""
-                nonlocal completed_queries
-                with lock:
-                    completed_queries += 1
+                """Update progress bar after a query completes"""
+                completed_queries = next(completed_counter)
+                if completed_queries % progress_step == 0 or completed_queries == total_queries:
                     progress = completed_queries / total_queries
                     progress_bar.progress(progress)
                     progress_text.text(f"Processing: {completed_queries}/{total_queries} queries completed")
             
-            # Use ThreadPoolExecutor for concurrent API calls
-            # Optimize worker count based on platforms and prompts
-            max_workers = min(
-                len(profile['platforms']) * 5,  # 5 concurrent requests per platform
-                total_queries,  # Don't exceed total queries
-                20  # Cap at 20 to avoid overwhelming APIs
-            )
+            def store_response(platform, prompt, response):
+                """Write a response into every slot of its prompt to keep prompt order"""
+                for index in prompt_slots[prompt]:
+                    all_responses[platform][index] = {
+                        'prompt': prompt,
+                        'response': response
+                    }
             
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all tasks
-                futures = []
-                for platform in profile['platforms']:
-                    all_responses[platform] = []
-                    for prompt in prompts:
-                        future = executor.submit(query_single_prompt, platform, prompt)
-                        futures.append(future)
-                
-                # Process completed tasks
-                for future in as_completed(futures):
-                    try:
-                        platform, prompt, response = future.result()
-                        all_responses[platform].append({
-                            'prompt': prompt,
-                            'response': response
-                        })
-                        update_progress()
-                    except Exception as e:
-                        st.warning(f"Error in concurrent query: {str(e)}")
+            # Serve cached pairs directly and batch the rest
+            jobs = []
+            for platform in profile['platforms']:
+                for prompt in prompt_slots:
+                    response = response_cache.get(platform, prompt)
+                    if response is None:
+                        jobs.append((platform, prompt))
+                    else:
+                        store_response(platform, prompt, response)
                         update_progress()
             
-            # Sort responses to maintain order
-            for platform in all_responses:
-                all_responses[platform].sort(key=lambda x: prompts.index(x['prompt']))
+            def on_result(index, response):
+                """Cache a fresh response as soon as it arrives"""
+                platform, prompt = jobs[index]
+                if ai_manager.is_cacheable_response(response):
+                    response_cache.put(platform, prompt, response)
+                update_progress()
+            
+            responses = ai_manager.run_batch(jobs, on_result=on_result)
+            for (platform, prompt), response in zip(jobs, responses):
+                store_response(platform, prompt, response)
+            # Drop responses past their ttl so the store doesn't grow with every past run
+            response_cache.purge_expired()
+            
+            status.update(label="✅ AI platforms queried", state="complete", expanded=False)
             
             progress_text.empty()
             
             # Analyze brand mentions
-            st.info("🔄 Analyzing brand mentions...")
+            step.info("🔄 Analyzing brand mentions...")
             brand_analysis = brand_analyzer.analyze_mentions(
                 all_responses, 
                 profile['brand_name']
             )
             
             # Analyze competitors
-            st.info("🔄 Analyzing competitor mentions...")
+            step.info("🔄 Analyzing competitor mentions...")
             competitor_analysis = competitor_analyzer.analyze_competitors(
                 all_responses, 
                 profile['competitors']
             )
             
             # Calculate visibility score
-            st.info("🔄 Calculating visibility score...")
+            step.info("🔄 Calculating visibility score...")
             visibility_score = visibility_scorer.calculate_score(
                 brand_analysis, 
                 competitor_analysis
@@ -534,12 +673,21 @@ def run_analysis():
                 'brand_analysis': brand_analysis,
                 'competitor_analysis': competitor_analysis,
                 'visibility_score': visibility_score,
+                'comparison': build_entity_comparison(
+                    profile['brand_name'],
+                    brand_analysis,
+                    competitor_analysis,
+                    profile['competitors']
+                ),
                 'timestamp': datetime.now().isoformat()
             }
+            st.session_state.analysis_data['analysis_id'] = analysis_digest(st.session_state.analysis_data)
             
             st.session_state.analysis_complete = True
-            st.success("✅ Analysis complete!")
-            st.rerun()
+            st.session_state.last_profile_hash = profile_hash(profile)
+            # main() renders the results further down this same run
+            status_slot.empty()
+            step.success("✅ Analysis complete!")
             
         except Exception as e:
             st.error(f"Analysis failed: {str(e)}")
@@ -581,49 +729,16 @@ def display_analysis_results():
     """, unsafe_allow_html=True)
     
     # Key metrics cards
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        score = data['visibility_score']['overall_score']
-        score_color = "#10B981" if score >= 70 else "#F59E0B" if score >= 40 else "#EF4444"
-        st.markdown(f"""
-        <div class="metric-card">
-            <h5 style="color: #6B7280; margin: 0;">Visibility Score</h5>
-            <h2 style="color: {score_color}; margin: 0.5rem 0;">{score}/100</h2>
-            <p style="color: #9CA3AF; font-size: 0.875rem;">Overall brand presence</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        total_mentions = sum(data['brand_analysis']['platform_mentions'].values())
-        st.markdown(f"""
-        <div class="metric-card">
-            <h5 style="color: #6B7280; margin: 0;">Total Mentions</h5>
-            <h2 style="color: #1F2937; margin: 0.5rem 0;">{total_mentions}</h2>
-            <p style="color: #9CA3AF; font-size: 0.875rem;">Across all platforms</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        avg_ranking = data['brand_analysis']['average_ranking']
-        ranking_display = "No Ranking Data" if not avg_ranking else f"#{avg_ranking}"
-        st.markdown(f"""
-        <div class="metric-card">
-            <h5 style="color: #6B7280; margin: 0;">Average Ranking</h5>
-            <h2 style="color: #1F2937; margin: 0.5rem 0;">{ranking_display}</h2>
-            <p style="color: #9CA3AF; font-size: 0.875rem;">Position in results</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        platforms_count = len(profile['platforms'])
-        st.markdown(f"""
-        <div class="metric-card">
-            <h5 style="color: #6B7280; margin: 0;">Platforms Analyzed</h5>
-            <h2 style="color: #1F2937; margin: 0.5rem 0;">{platforms_count}</h2>
-            <p style="color: #9CA3AF; font-size: 0.875rem;">AI systems queried</p>
-        </div>
-        """, unsafe_allow_html=True)
+    score = data['visibility_score']['overall_score']
+    score_color = "#10B981" if score >= 70 else "#F59E0B" if score >= 40 else "#EF4444"
+    avg_ranking = data['brand_analysis']['average_ranking']
+    ranking_display = "No Ranking Data" if not avg_ranking else f"#{avg_ranking}"
+    metric_row([
+        metric_card("Visibility Score", f"{score}/100", "Overall brand presence", value_color=score_color),
+        metric_card("Total Mentions", data['brand_analysis']['total_mentions'], "Across all platforms"),
+        metric_card("Average Ranking", ranking_display, "Position in results"),
+        metric_card("Platforms Analyzed", len(profile['platforms']), "AI systems queried")
+    ])
     
     # Tabs for different views
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -649,94 +764,67 @@ def display_analysis_results():
     with tab5:
         display_insights_recommendations(data, profile)
 
-def display_overview_dashboard(data, profile):
-    """Display the overview dashboard"""
-    # Platform performance section
-    st.markdown('<div class="section-header"><h3>Platform Performance</h3></div>', unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Platform mentions pie chart with better styling
-        platform_mentions = data['brand_analysis']['platform_mentions']
-        if any(platform_mentions.values()):
-            # Create custom color scheme for platforms
-            colors = {
-                'openai': '#10B981',
-                'gemini': '#3B82F6',
-                'perplexity': '#8B5CF6'
-            }
-            
-            fig = px.pie(
-                values=list(platform_mentions.values()),
-                names=[p.upper() for p in platform_mentions.keys()],
-                title="Brand Mentions Distribution",
-                color_discrete_map={k.upper(): v for k, v in colors.items()}
-            )
-            fig.update_layout(
-                font=dict(family="sans serif", size=14),
-                title_font_size=18,
-                showlegend=True,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.markdown("""
-            <div class="metric-card" style="text-align: center; padding: 3rem;">
-                <p style="color: #6B7280;">No brand mentions found across platforms</p>
-            </div>
-            """, unsafe_allow_html=True)
-    
-    with col2:
-        # Visibility score gauge with modern styling
-        score = data['visibility_score']['overall_score']
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = score,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Overall Visibility Score", 'font': {'size': 18}},
-            delta = {'reference': 50, 'relative': False},
-            gauge = {
-                'axis': {'range': [None, 100], 'tickwidth': 1},
-                'bar': {'color': "#6366F1"},
-                'steps': [
-                    {'range': [0, 25], 'color': "#FEE2E2"},
-                    {'range': [25, 50], 'color': "#FEF3C7"},
-                    {'range': [50, 75], 'color': "#D1FAE5"},
-                    {'range': [75, 100], 'color': "#A7F3D0"}
-                ],
-                'threshold': {
-                    'line': {'color': "#1F2937", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 80
-                }
+@st.cache_data(show_spinner=False)
+def build_mentions_pie(platform_mentions):
+    """Build the platform mentions pie once per distinct (platform, mentions) tuple"""
+    import plotly.express as px
+    
+    fig = px.pie(
+        values=[mentions for _, mentions in platform_mentions],
+        names=[platform.upper() for platform, _ in platform_mentions],
+        title="Brand Mentions Distribution",
+        color_discrete_map=PLATFORM_CHART_COLORS
+    )
+    fig.update_layout(
+        font=dict(family="sans serif", size=14),
+        title_font_size=18,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        uirevision='const'  # Keep hidden legend entries across reruns
+    )
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_score_gauge(score):
+    """Build the visibility score gauge once per distinct score"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = score,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "Overall Visibility Score", 'font': {'size': 18}},
+        delta = {'reference': 50, 'relative': False},
+        gauge = {
+            'axis': {'range': [None, 100], 'tickwidth': 1},
+            'bar': {'color': "#6366F1"},
+            'steps': [
+                {'range': [0, 25], 'color': "#FEE2E2"},
+                {'range': [25, 50], 'color': "#FEF3C7"},
+                {'range': [50, 75], 'color': "#D1FAE5"},
+                {'range': [75, 100], 'color': "#A7F3D0"}
+            ],
+            'threshold': {
+                'line': {'color': "#1F2937", 'width': 4},
+                'thickness': 0.75,
+                'value': 80
             }
-        ))
-        fig.update_layout(
-            font=dict(family="sans serif", size=14),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            margin=dict(l=20, r=20, t=40, b=20)
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Brand vs Competitors comparison
-    st.markdown('<div class="section-header"><h3>Competitive Landscape</h3></div>', unsafe_allow_html=True)
-    
-    competitor_data = data['competitor_analysis']
-    brand_name = profile['brand_name']
-    
-    # Create comparison data
-    comparison_data = {
-        'Entity': [brand_name] + profile['competitors'],
-        'Total Mentions': [sum(data['brand_analysis']['platform_mentions'].values())] + 
-                         [competitor_data.get(comp, {}).get('total_mentions', 0) for comp in profile['competitors']],
-        'Average Ranking': [data['brand_analysis']['average_ranking'] or 0] + 
-                          [competitor_data.get(comp, {}).get('average_ranking', 0) for comp in profile['competitors']]
-    }
-    
-    df = pd.DataFrame(comparison_data)
+        }
+    ))
+    fig.update_layout(
+        font=dict(family="sans serif", size=14),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_landscape_bars(brand_name, entities, mentions, rankings):
+    """Build the competitive landscape bars once per distinct comparison"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
     
     # Create modern bar charts
     fig = make_subplots(
@@ -746,31 +834,31 @@ def display_overview_dashboard(data, profile):
     )
     
     # Color mapping
-    colors = ['#6366F1' if x == brand_name else '#E5E7EB' for x in df['Entity']]
+    colors = ['#6366F1' if x == brand_name else '#E5E7EB' for x in entities]
     
     fig.add_trace(
         go.Bar(
-            x=df['Entity'], 
-            y=df['Total Mentions'], 
+            x=entities, 
+            y=mentions, 
             name='Mentions',
             marker_color=colors,
-            text=df['Total Mentions'],
+            text=mentions,
             textposition='auto',
         ),
         row=1, col=1
     )
     
     # For ranking, lower is better but we display it inverted for visual clarity
-    max_rank = max(df['Average Ranking']) if any(df['Average Ranking']) else 1
-    inverted_rankings = [max_rank - r + 1 if r > 0 else 0 for r in df['Average Ranking']]
+    max_rank = max(rankings) if any(rankings) else 1
+    inverted_rankings = [max_rank - r + 1 if r > 0 else 0 for r in rankings]
     
     fig.add_trace(
         go.Bar(
-            x=df['Entity'], 
+            x=entities, 
             y=inverted_rankings,
             name='Position',
             marker_color=colors,
-            text=[f"#{int(r)}" if r > 0 else "N/A" for r in df['Average Ranking']],
+            text=[f"#{int(r)}" if r > 0 else "N/A" for r in rankings],
             textposition='auto',
         ),
         row=1, col=2
@@ -782,130 +870,152 @@ def display_overview_dashboard(data, profile):
         paper_bgcolor='rgba(0,0,0,0)',
         font=dict(family="sans serif", size=12),
         title_font_size=16,
-        hovermode='x unified'
+        hovermode='x unified',
+        uirevision='const'  # Keep zoom/legend state across reruns
     )
     
     fig.update_xaxes(showgrid=False)
     fig.update_yaxes(showgrid=True, gridcolor='#F3F4F6')
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig.to_dict()
+
+@st.fragment
+def display_overview_dashboard(data, profile):
+    """Display the overview dashboard"""
+    # Platform performance section
+    st.markdown('<div class="section-header"><h3>Platform Performance</h3></div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Platform mentions pie chart with better styling
+        platform_mentions = data['brand_analysis']['platform_mentions']
+        if any(platform_mentions.values()):
+            st.plotly_chart(build_mentions_pie(tuple(platform_mentions.items())), use_container_width=True, key="overview_pie")
+        else:
+            st.markdown("""
+            <div class="metric-card" style="text-align: center; padding: 3rem;">
+                <p style="color: #6B7280;">No brand mentions found across platforms</p>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    with col2:
+        # Visibility score gauge with modern styling
+        score = data['visibility_score']['overall_score']
+        st.plotly_chart(build_score_gauge(score), use_container_width=True, key="overview_gauge")
+    
+    # Brand vs Competitors comparison
+    st.markdown('<div class="section-header"><h3>Competitive Landscape</h3></div>', unsafe_allow_html=True)
+    
+    comparison = data['comparison']
+    fig = build_landscape_bars(
+        profile['brand_name'],
+        tuple(comparison['Entity'].to_pylist()),
+        tuple(comparison['Total Mentions'].to_pylist()),
+        tuple(comparison['Average Ranking'].fill_null(0).to_pylist())
+    )
+    st.plotly_chart(fig, use_container_width=True, key="overview_landscape")
+
+# Stand-in for a platform missing from platform_details; the analyzer fills these keys for every platform
+_EMPTY_PLATFORM_DETAILS = MappingProxyType({
+    'mentions': 0,
+    'average_ranking': None,
+    'mention_rate': 0.0,
+    'sample_mentions': ()
+})
 
+@st.fragment
 def display_platform_analysis(data, profile):
     """Display platform-specific analysis"""
-    st.markdown('<div class="section-header"><h3>Platform-Specific Performance</h3></div>', unsafe_allow_html=True)
+    # The whole tab is static HTML, so it goes out as a single markdown element
+    parts = ['<div class="section-header"><h3>Platform-Specific Performance</h3></div>']
     
     # Platform performance cards
-    platform_colors = {
-        'openai': {'bg': '#10B981', 'name': 'ChatGPT'},
-        'gemini': {'bg': '#3B82F6', 'name': 'Google Gemini'},
-        'perplexity': {'bg': '#8B5CF6', 'name': 'Perplexity AI'},
-        'copilot': {'bg': '#0078D4', 'name': 'Microsoft Copilot'},
-        'meta': {'bg': '#0866FF', 'name': 'Meta AI'}
-    }
-    
     for platform in profile['platforms']:
-        platform_data = data['brand_analysis']['platform_details'].get(platform, {})
-        platform_info = platform_colors.get(platform, {'bg': '#6366F1', 'name': platform.upper()})
+        platform_data = data['brand_analysis']['platform_details'].get(platform, _EMPTY_PLATFORM_DETAILS)
+        platform_info = PLATFORM_META.get(platform) or {'bg': '#6366F1', 'name': platform.upper()}
         
         # Platform header with badge
-        st.markdown(f"""
-        <div style="margin: 1.5rem 0;">
-            <span class="platform-badge" style="background: {platform_info['bg']}; font-size: 1rem; padding: 0.5rem 1rem;">
-                {platform_info['name']}
-            </span>
-        </div>
-        """, unsafe_allow_html=True)
+        parts.append(_PLATFORM_BADGE.format_map({'bg': platform_info['bg'], 'name': html.escape(platform_info['name'])}))
         
         # Metrics in cards
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            mentions = platform_data.get('mentions', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <h5 style="color: #6B7280; margin: 0;">Mentions</h5>
-                <h3 style="color: #1F2937; margin: 0.5rem 0;">{mentions}</h3>
-                <p style="color: #9CA3AF; font-size: 0.875rem;">Brand occurrences</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            avg_rank = platform_data.get('average_ranking')
-            rank_display = "No Data" if not avg_rank else f"#{int(avg_rank)}"
-            st.markdown(f"""
-            <div class="metric-card">
-                <h5 style="color: #6B7280; margin: 0;">Avg. Ranking</h5>
-                <h3 style="color: #1F2937; margin: 0.5rem 0;">{rank_display}</h3>
-                <p style="color: #9CA3AF; font-size: 0.875rem;">Position in results</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            mention_rate = platform_data.get('mention_rate', 0)
-            st.markdown(f"""
-            <div class="metric-card">
-                <h5 style="color: #6B7280; margin: 0;">Mention Rate</h5>
-                <h3 style="color: #1F2937; margin: 0.5rem 0;">{mention_rate:.1%}</h3>
-                <p style="color: #9CA3AF; font-size: 0.875rem;">Response coverage</p>
-            </div>
-            """, unsafe_allow_html=True)
+        avg_rank = platform_data['average_ranking']
+        rank_display = "No Data" if not avg_rank else f"#{int(avg_rank)}"
+        parts.append(render_metric_row([
+            metric_card("Mentions", platform_data['mentions'], "Brand occurrences", value_tag="h3"),
+            metric_card("Avg. Ranking", rank_display, "Position in results", value_tag="h3"),
+            metric_card("Mention Rate", f"{platform_data['mention_rate']:.1%}", "Response coverage", value_tag="h3")
+        ]))
         
         # Sample mentions section
-        if 'sample_mentions' in platform_data and platform_data['sample_mentions']:
-            st.markdown("#### Sample Brand Mentions")
+        if platform_data['sample_mentions']:
+            parts.append("<h4>Sample Brand Mentions</h4>")
             
-            for i, sample in enumerate(platform_data['sample_mentions'][:3]):
-                st.markdown(f"""
-                <div class="metric-card" style="margin-bottom: 1rem;">
-                    <p style="color: #6366F1; font-weight: 500; margin-bottom: 0.5rem;">
-                        Query: {sample['prompt']}
-                    </p>
-                    <p style="color: #4B5563; line-height: 1.6;">
-                        {sample['response'][:250]}...
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
+            for sample in itertools.islice(platform_data['sample_mentions'], 3):
+                # Collapse whitespace so a blank line in the response can't end the HTML block
+                parts.append(_SAMPLE_CARD.format_map({
+                    'prompt': html.escape(sample.prompt),
+                    'response': html.escape(" ".join(sample.preview.split()))
+                }))
         
-        st.markdown("---")
+        parts.append("<hr>")
+    
+    st.markdown("\n".join(parts), unsafe_allow_html=True)
 
+@st.cache_data(show_spinner=False)
+def build_positioning_scatter(entities, mentions, rankings, size_max=20):
+    """Build the competitive positioning scatter once per distinct comparison"""
+    import plotly.graph_objects as go
+    
+    # One trace per entity keeps a legend entry each; marker area scales with mentions
+    sizeref = 2.0 * max(max(mentions), 1) / size_max ** 2
+    fig = go.Figure([
+        go.Scatter(
+            x=[entity_mentions],
+            y=[ranking],
+            name=entity,
+            mode='markers',
+            marker=dict(size=[entity_mentions], sizemode='area', sizeref=sizeref, sizemin=0),
+            hovertemplate=f"{entity}<br>Total Mentions=%{{x}}<br>Average Ranking=%{{y}}<extra></extra>"
+        )
+        for entity, entity_mentions, ranking in zip(entities, mentions, rankings)
+    ])
+    fig.update_layout(
+        title="Competitive Positioning (Higher mentions + Lower ranking = Better)",
+        xaxis_title='Total Mentions',
+        yaxis_title='Average Ranking (Lower is Better)',
+        legend_title_text='Entity',
+        uirevision='const'  # Keep zoom/legend state across reruns
+    )
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_competitor_view(analysis_id, brand_name, competitors, _comparison):
+    """Labelled comparison table and positioning chart, built once per analysis"""
+    labels = [f"🎯 {brand_name}"] + [f"🏢 {competitor}" for competitor in competitors]
+    comparison = _comparison.set_column(0, 'Entity', pa.array(labels))
+    
+    fig = None
+    if comparison.num_rows > 1:
+        fig = build_positioning_scatter(
+            tuple(labels),
+            tuple(comparison['Total Mentions'].to_pylist()),
+            tuple(comparison['Average Ranking'].to_pylist())
+        )
+    return comparison, fig
+
+@st.fragment
 def display_competitor_comparison(data, profile):
     """Display competitor comparison"""
     st.markdown("### Competitor Performance Analysis")
     
-    competitor_data = data['competitor_analysis']
-    brand_name = profile['brand_name']
-    
-    # Create detailed comparison table
-    comparison_rows = []
-    
-    # Add brand data
-    brand_analysis = data['brand_analysis']
-    comparison_rows.append({
-        'Entity': f"🎯 {brand_name}",
-        'Total Mentions': sum(brand_analysis['platform_mentions'].values()),
-        'Average Ranking': brand_analysis['average_ranking'] or 0,
-        'OpenAI Mentions': brand_analysis['platform_mentions'].get('openai', 0),
-        'Gemini Mentions': brand_analysis['platform_mentions'].get('gemini', 0),
-        'Perplexity Mentions': brand_analysis['platform_mentions'].get('perplexity', 0)
-    })
-    
-    # Add competitor data
-    for competitor in profile['competitors']:
-        comp_data = competitor_data.get(competitor, {})
-        comparison_rows.append({
-            'Entity': f"🏢 {competitor}",
-            'Total Mentions': comp_data.get('total_mentions', 0),
-            'Average Ranking': comp_data.get('average_ranking', 0),
-            'OpenAI Mentions': comp_data.get('platform_mentions', {}).get('openai', 0),
-            'Gemini Mentions': comp_data.get('platform_mentions', {}).get('gemini', 0),
-            'Perplexity Mentions': comp_data.get('platform_mentions', {}).get('perplexity', 0)
-        })
-    
-    df_comparison = pd.DataFrame(comparison_rows)
+    comparison, fig = build_competitor_view(
+        data['analysis_id'], profile['brand_name'], tuple(profile['competitors']), data['comparison']
+    )
     
     # Style the dataframe
     st.dataframe(
-        df_comparison,
+        comparison,
         use_container_width=True,
         hide_index=True
     )
@@ -913,36 +1023,27 @@ def display_competitor_comparison(data, profile):
     # Competitive positioning chart
     st.markdown("### Competitive Positioning")
     
-    if len(comparison_rows) > 1:
-        fig = px.scatter(
-            df_comparison,
-            x='Total Mentions',
-            y='Average Ranking',
-            size='Total Mentions',
-            color='Entity',
-            title="Competitive Positioning (Higher mentions + Lower ranking = Better)",
-            labels={'Average Ranking': 'Average Ranking (Lower is Better)'}
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True, key="competitor_positioning")
 
+@st.fragment
 def display_detailed_results(data, profile):
     """Display detailed results"""
     st.markdown("### Detailed Analysis Results")
     
     # Generated prompts
     with st.expander("📝 Generated Prompts"):
-        for i, prompt in enumerate(data['prompts'], 1):
-            st.write(f"{i}. {prompt}")
+        # One element for the whole list instead of one per prompt
+        st.markdown("\n".join(f"{i}. {prompt}" for i, prompt in enumerate(data['prompts'], 1)))
     
     # Platform responses
     with st.expander("🤖 AI Platform Responses"):
         for platform, responses in data['responses'].items():
             st.markdown(f"#### {platform.upper()} Responses")
             
-            for i, response_data in enumerate(responses[:5], 1):  # Show first 5
+            for i, response_data in enumerate(itertools.islice(responses, 5), 1):  # Show first 5
                 with st.expander(f"Response {i}: {response_data['prompt'][:50]}..."):
-                    st.markdown(f"**Prompt:** {response_data['prompt']}")
-                    st.markdown(f"**Response:** {response_data['response']}")
+                    st.markdown(f"**Prompt:** {response_data['prompt']}\n\n**Response:** {response_data['response']}")
     
     # Export functionality
     st.markdown("### 📥 Export Results")
@@ -953,40 +1054,53 @@ def display_detailed_results(data, profile):
         if st.button("📊 Export Analysis Report"):
             export_data = {
                 'brand_profile': profile,
-                'analysis_results': data,
+                'analysis_results': {key: value for key, value in data.items() if key != 'comparison'},
                 'export_timestamp': datetime.now().isoformat()
             }
             
             st.download_button(
                 label="Download JSON Report",
-                data=json.dumps(export_data, indent=2),
+                data=orjson.dumps(
+                    export_data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                ),
                 file_name=f"{profile['brand_name']}_visibility_analysis.json",
                 mime="application/json"
             )
     
     with col2:
         if st.button("📋 Export Summary CSV"):
-            # Create summary DataFrame
+            # Create summary rows
             summary_data = {
                 'Metric': ['Overall Visibility Score', 'Total Brand Mentions', 'Average Ranking', 'Top Platform'],
                 'Value': [
                     data['visibility_score']['overall_score'],
-                    sum(data['brand_analysis']['platform_mentions'].values()),
+                    data['brand_analysis']['total_mentions'],
                     data['brand_analysis']['average_ranking'] or 0,
-                    max(data['brand_analysis']['platform_mentions'], key=data['brand_analysis']['platform_mentions'].get)
+                    data['brand_analysis']['top_platform']
                 ]
             }
             
-            df_summary = pd.DataFrame(summary_data)
-            csv = df_summary.to_csv(index=False)
+            buf = io.StringIO()
+            # Same line endings as the previous DataFrame.to_csv output
+            writer = csv.writer(buf, lineterminator='\n')
+            writer.writerow(summary_data.keys())
+            writer.writerows(zip(*summary_data.values()))
             
             st.download_button(
                 label="Download CSV Summary",
-                data=csv,
+                data=buf.getvalue(),
                 file_name=f"{profile['brand_name']}_summary.csv",
                 mime="text/csv"
             )
 
+_NO_MENTIONS_FOCUS = (
+    "**Priority Actions:** Your brand was not mentioned on any platform yet. "
+    "Start by publishing content that names your brand alongside the topics users ask AI assistants about, "
+    "then re-run the analysis to find the platforms to focus on."
+)
+
+@st.fragment
 def display_insights_recommendations(data, profile):
     """Display insights and recommendations"""
     st.markdown("### 💡 Key Insights & Recommendations")
@@ -1019,14 +1133,22 @@ def display_insights_recommendations(data, profile):
     # Strategic recommendations based on score
     st.markdown("#### 🎯 Strategic Focus Areas")
     
-    brand_mentions = data['brand_analysis']['platform_mentions']
-    lowest_platform = min(brand_mentions, key=brand_mentions.get)
-    highest_platform = max(brand_mentions, key=brand_mentions.get)
+    brand_analysis = data['brand_analysis']
+    if not brand_analysis['total_mentions']:
+        # Lowest/highest platform would be meaningless with no mentions anywhere
+        st.info(_NO_MENTIONS_FOCUS)
+        return
+    
+    platform_mentions = brand_analysis['platform_mentions']
+    lowest_platform = brand_analysis['lowest_platform']
+    highest_platform = brand_analysis['top_platform']
+    lowest_mentions = platform_mentions[lowest_platform]
+    highest_mentions = platform_mentions[highest_platform]
     
     st.markdown(f"""
     **Priority Actions:**
-    1. **Focus on {lowest_platform.upper()}**: This platform shows the lowest brand mentions ({brand_mentions[lowest_platform]})
-    2. **Leverage {highest_platform.upper()}**: This platform shows the highest brand mentions ({brand_mentions[highest_platform]})
+    1. **Focus on {lowest_platform.upper()}**: This platform shows the lowest brand mentions ({lowest_mentions})
+    2. **Leverage {highest_platform.upper()}**: This platform shows the highest brand mentions ({highest_mentions})
     3. **Competitor Analysis**: Monitor competitor strategies on platforms where they outperform you
     4. **Content Strategy**: Develop content that naturally includes your brand for AI training
     """)
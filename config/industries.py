@@ -1,6 +1,10 @@
 """Industry-specific configurations for prompt generation"""
 
-INDUSTRIES = {
+import functools
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+_INDUSTRY_CONFIGS = {
     'FinTech': {
         'terms': [
             'fintech', 'financial technology', 'digital banking', 'mobile payments',
@@ -257,3 +261,16 @@ INDUSTRIES = {
         ]
     }
 }
+
+
+@functools.cache
+def get_industries() -> Mapping[str, Mapping[str, Tuple[str, ...]]]:
+    """Read-only view of the industry configs, built once per process"""
+    # Every prompt generation shares these (a location is layered on top, not
+    # copied in), so freeze them: tuples for the term lists, mapping proxies above them
+    return MappingProxyType({
+        industry: MappingProxyType({key: tuple(values) for key, values in config.items()})
+        for industry, config in _INDUSTRY_CONFIGS.items()
+    })
+
+INDUSTRIES = get_industries()
@@ -1,46 +1,150 @@
 import os
-import json
-import requests
-from typing import Dict, List, Optional
+import orjson
+import asyncio
+import contextlib
+import httpx
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 import time
-from openai import OpenAI
-from google import genai
-from google.genai import types
+
+# Prefixes used to report failed queries instead of platform output
+ERROR_PREFIXES = (
+    "Error querying",
+    "OpenAI API Error",
+    "Gemini API Error",
+    "Perplexity API Error"
+)
+
+# Returned by Gemini when it produces no text; not a real answer, so never cached
+EMPTY_GEMINI_RESPONSE = "No response generated"
+
+PERPLEXITY_URL = "https://api.perplexity.ai/chat/completions"
+
+# Perplexity statuses worth retrying, and how often before giving up
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+# Longest Retry-After honored; a server asking for more is not retried, as the wait would stall the batch
+MAX_RETRY_DELAY = 30.0
+
+# Seconds a connectivity probe result is reused before probing again
+CONNECTIVITY_TTL = 60
+
+class PlatformClients(NamedTuple):
+    """Async API clients bound to a single event loop"""
+    http: httpx.AsyncClient
+    openai: Any
+    gemini: Any
 
 class AIPlatformManager:
     """Manager for querying different AI platforms"""
     
     def __init__(self):
-        # Initialize API clients
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", ""))
-        self.gemini_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY", ""))
+        # API credentials - async clients are opened per event loop in open_clients()
+        self.openai_api_key = os.getenv("OPENAI_API_KEY", "")
+        self.gemini_api_key = os.getenv("GEMINI_API_KEY", "")
         self.perplexity_api_key = os.getenv("PERPLEXITY_API_KEY", "")
+        self.perplexity_headers = {
+            'Authorization': f'Bearer {self.perplexity_api_key}',
+            'Content-Type': 'application/json'
+        }
+        # platform -> query coroutine method
+        self._dispatch = {
+            "openai": self._query_openai,
+            "gemini": self._query_gemini,
+            "perplexity": self._query_perplexity,
+            # Copilot and Meta AI disabled
+            # "copilot": self._query_copilot,
+            # "meta": self._query_meta,
+        }
+        # platform -> (monotonic probe time, reachable), reused for CONNECTIVITY_TTL seconds
+        self._connectivity: Dict[str, Tuple[float, bool]] = {}
+    
+    @contextlib.asynccontextmanager
+    async def open_clients(self, max_connections: int = 50):
+        """Open async API clients sharing one connection pool for the current event loop"""
+        # Vendor SDKs are slow to import, so load them only once a query or probe needs them
+        from openai import AsyncOpenAI
+        from google import genai
+        from google.genai import types as genai_types
         
+        async with httpx.AsyncClient(
+            # Fail fast on unreachable hosts but allow slow completions
+            timeout=httpx.Timeout(60.0, connect=3.05),
+            transport=httpx.AsyncHTTPTransport(
+                # Keep every pooled connection alive so repeat calls skip the TCP/TLS handshake
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                # Retry failed connection attempts; HTTP error statuses are handled per platform
+                retries=2
+            )
+        ) as http_client:
+            # Gemini sends its async requests through the same pool; the SDK client is closed on
+            # exit so its own transport is released before asyncio.run closes the loop
+            gemini_client = genai.Client(
+                api_key=self.gemini_api_key,
+                http_options=genai_types.HttpOptions(httpx_async_client=http_client)
+            )
+            with gemini_client:
+                async with gemini_client.aio as gemini:
+                    yield PlatformClients(
+                        http=http_client,
+                        openai=AsyncOpenAI(api_key=self.openai_api_key, http_client=http_client),
+                        gemini=gemini
+                    )
+    
     def query_platform(self, platform: str, prompt: str) -> str:
         """Query a specific AI platform with a prompt"""
+        return self.run_batch([(platform, prompt)])[0]
+    
+    def run_batch(self, jobs: List[Tuple[str, str]], concurrency: int = 5,
+                  on_result: Optional[Callable[[int, str], None]] = None) -> List[str]:
+        """Synchronous wrapper around query_batch for callers without an event loop"""
+        return asyncio.run(self.query_batch(jobs, concurrency=concurrency, on_result=on_result))
+    
+    async def query_batch(self, jobs: List[Tuple[str, str]], clients: Optional[PlatformClients] = None,
+                          concurrency: int = 5,
+                          on_result: Optional[Callable[[int, str], None]] = None) -> List[str]:
+        """Query (platform, prompt) jobs concurrently and return the responses in job order"""
+        if not jobs:
+            return []
+        if clients is None:
+            async with self.open_clients() as clients:
+                return await self.query_batch(jobs, clients, concurrency, on_result)
+        
+        # Separate limits per platform so a slow vendor doesn't hold up the others
+        semaphores = {platform: asyncio.Semaphore(concurrency) for platform, _ in jobs}
+        
+        async def run_job(index: int, platform: str, prompt: str) -> str:
+            async with semaphores[platform]:
+                response = await self.query_platform_async(platform, prompt, clients)
+            if on_result is not None:
+                on_result(index, response)
+            return response
+        
+        results = await asyncio.gather(
+            *(run_job(index, platform, prompt) for index, (platform, prompt) in enumerate(jobs)),
+            return_exceptions=True
+        )
+        return [
+            f"Error querying {platform}: {str(result)}" if isinstance(result, BaseException) else result
+            for (platform, _), result in zip(jobs, results)
+        ]
+    
+    async def query_platform_async(self, platform: str, prompt: str, clients: PlatformClients) -> str:
+        """Query a specific AI platform with a prompt using already opened clients"""
         try:
-            if platform == "openai":
-                return self._query_openai(prompt)
-            elif platform == "gemini":
-                return self._query_gemini(prompt)
-            elif platform == "perplexity":
-                return self._query_perplexity(prompt)
-            # Copilot and Meta AI disabled
-            # elif platform == "copilot":
-            #     return self._query_copilot(prompt)
-            # elif platform == "meta":
-            #     return self._query_meta(prompt)
-            else:
-                raise ValueError(f"Unsupported platform: {platform}")
+            try:
+                query = self._dispatch[platform]
+            except KeyError:
+                raise ValueError(f"Unsupported platform: {platform}") from None
+            return await query(prompt, clients)
         except Exception as e:
             return f"Error querying {platform}: {str(e)}"
     
-    def _query_openai(self, prompt: str) -> str:
+    async def _query_openai(self, prompt: str, clients: PlatformClients) -> str:
         """Query OpenAI's ChatGPT"""
         try:
             # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
             # do not change this unless explicitly requested by the user
-            response = self.openai_client.chat.completions.create(
+            response = await clients.openai.chat.completions.create(
                 model="gpt-4o",
                 messages=[
                     {"role": "user", "content": prompt}
@@ -52,25 +156,20 @@ class AIPlatformManager:
         except Exception as e:
             return f"OpenAI API Error: {str(e)}"
     
-    def _query_gemini(self, prompt: str) -> str:
+    async def _query_gemini(self, prompt: str, clients: PlatformClients) -> str:
         """Query Google's Gemini"""
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await clients.gemini.models.generate_content(
                 model="gemini-2.5-flash",
                 contents=prompt
             )
-            return response.text or "No response generated"
+            return response.text or EMPTY_GEMINI_RESPONSE
         except Exception as e:
             return f"Gemini API Error: {str(e)}"
     
-    def _query_perplexity(self, prompt: str) -> str:
+    async def _query_perplexity(self, prompt: str, clients: PlatformClients) -> str:
         """Query Perplexity AI"""
         try:
-            headers = {
-                'Authorization': f'Bearer {self.perplexity_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
             data = {
                 "model": "llama-3.1-sonar-small-128k-online",
                 "messages": [
@@ -92,14 +191,21 @@ class AIPlatformManager:
                 "stream": False
             }
             
-            response = requests.post(
-                "https://api.perplexity.ai/chat/completions",
-                headers=headers,
-                json=data
-            )
+            for attempt in range(MAX_RETRIES + 1):
+                response = await clients.http.post(
+                    PERPLEXITY_URL,
+                    headers=self.perplexity_headers,
+                    json=data
+                )
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    break
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 return result['choices'][0]['message']['content']
             else:
                 return f"Perplexity API Error: {response.status_code} - {response.text}"
@@ -107,7 +213,16 @@ class AIPlatformManager:
         except Exception as e:
             return f"Perplexity API Error: {str(e)}"
     
-    def _query_copilot(self, prompt: str) -> str:
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, honoring a numeric Retry-After header up to
+        MAX_RETRY_DELAY; None when the server asks for a longer wait than that"""
+        try:
+            delay = max(0.0, float(response.headers['Retry-After']))
+        except (KeyError, ValueError):
+            return 0.5 * 2 ** attempt
+        return delay if delay <= MAX_RETRY_DELAY else None
+    
+    async def _query_copilot(self, prompt: str, clients: PlatformClients) -> str:
         """Query Microsoft Copilot (Bing-integrated AI)"""
         try:
             # Note: Microsoft Copilot doesn't have a direct public API
@@ -118,7 +233,7 @@ class AIPlatformManager:
         except Exception as e:
             return f"Microsoft Copilot Error: {str(e)}"
     
-    def _query_meta(self, prompt: str) -> str:
+    async def _query_meta(self, prompt: str, clients: PlatformClients) -> str:
         """Query Meta AI"""
         try:
             # Note: Meta AI doesn't have a direct public API for external use
@@ -128,22 +243,67 @@ class AIPlatformManager:
         except Exception as e:
             return f"Meta AI Error: {str(e)}"
     
+    def is_error_response(self, response: str) -> bool:
+        """Check if a response is an error message rather than platform output"""
+        return response.startswith(ERROR_PREFIXES)
+    
+    def is_cacheable_response(self, response: str) -> bool:
+        """Check if a response is real platform output worth reusing in later runs"""
+        return bool(response) and response != EMPTY_GEMINI_RESPONSE and not self.is_error_response(response)
+    
     def test_platform_connectivity(self, platform: str) -> bool:
         """Test if a platform is accessible"""
-        try:
-            test_prompt = "Hello, this is a test message."
-            response = self.query_platform(platform, test_prompt)
-            return not response.startswith("Error")
-        except:
-            return False
+        return self._check_connectivity([platform])[platform]
     
     def get_platform_status(self) -> Dict[str, bool]:
         """Get status of all platforms"""
-        return {
-            "openai": self.test_platform_connectivity("openai"),
-            "gemini": self.test_platform_connectivity("gemini"),
-            "perplexity": self.test_platform_connectivity("perplexity")
-            # Copilot and Meta AI disabled
-            # "copilot": self.test_platform_connectivity("copilot"),
-            # "meta": self.test_platform_connectivity("meta")
-        }
+        # Copilot and Meta AI disabled
+        return self._check_connectivity(["openai", "gemini", "perplexity"])
+    
+    def _check_connectivity(self, platforms: List[str]) -> Dict[str, bool]:
+        """Return recent probe results, probing stale platforms together on one event loop"""
+        now = time.monotonic()
+        stale = [
+            platform for platform in platforms
+            if platform not in self._connectivity
+            or now - self._connectivity[platform][0] > CONNECTIVITY_TTL
+        ]
+        if stale:
+            try:
+                results = asyncio.run(self._probe_platforms(stale))
+            except Exception:
+                results = {platform: False for platform in stale}
+            for platform, reachable in results.items():
+                self._connectivity[platform] = (now, reachable)
+        return {platform: self._connectivity[platform][1] for platform in platforms}
+    
+    async def _probe_platforms(self, platforms: List[str]) -> Dict[str, bool]:
+        """Probe several platforms concurrently with shared clients"""
+        async with self.open_clients() as clients:
+            results = await asyncio.gather(
+                *(self._probe_platform(platform, clients) for platform in platforms),
+                return_exceptions=True
+            )
+        return {platform: result is True for platform, result in zip(platforms, results)}
+    
+    async def _probe_platform(self, platform: str, clients: PlatformClients) -> bool:
+        """Cheapest authenticated request per platform, raising if it fails"""
+        if platform == "openai":
+            await clients.openai.models.list()
+        elif platform == "gemini":
+            await clients.gemini.models.list(config={'page_size': 1})
+        elif platform == "perplexity":
+            # No model listing endpoint, so send a one-token completion
+            response = await clients.http.post(
+                PERPLEXITY_URL,
+                headers=self.perplexity_headers,
+                json={
+                    "model": "llama-3.1-sonar-small-128k-online",
+                    "messages": [{"role": "user", "content": "Hi"}],
+                    "max_tokens": 1
+                }
+            )
+            response.raise_for_status()
+        else:
+            raise ValueError(f"Unsupported platform: {platform}")
+        return True
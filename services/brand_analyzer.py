@@ -1,186 +1,269 @@
 import re
-from typing import Dict, List, Any, Optional
-from utils.nlp_processor import NLPProcessor
+import functools
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+from utils.nlp_processor import brand_variations, get_nlp_processor
 from utils.data_processor import DataProcessor
 
+# Numbered list item ("3. Brand ...") and ranking words
+NUMBERED_ITEM_PATTERN = re.compile(r'^(\d+)\.')
+RANK_WORDS = {
+    'first': 1, '#1': 1, 'number one': 1,
+    'second': 2, '#2': 2, 'number two': 2,
+    'third': 3, '#3': 3, 'number three': 3,
+    'fourth': 4, '#4': 4, 'number four': 4,
+    'fifth': 5, '#5': 5, 'number five': 5
+}
+RANK_WORD_PATTERN = re.compile('|'.join(re.escape(word) for word in RANK_WORDS))
+
+# Characters re.IGNORECASE matches to an ASCII letter that str.lower() does not turn into it
+CASE_FOLD_EXCEPTIONS = ('\u0130', '\u0131', '\u017f')
+
+@functools.lru_cache(maxsize=256)
+def _compile_mention_pattern(brand_name: str) -> re.Pattern:
+    """One case-insensitive alternation of the brand name and its counted variations"""
+    # Brand name plus variations (e.g., "PolicyBazaar" -> "Policy Bazaar"), longest first so
+    # the fullest name wins where alternatives overlap
+    names = sorted({brand_name, *brand_variations(brand_name, include_unspaced=False)}, key=len, reverse=True)
+    return re.compile('|'.join(re.escape(name) for name in names), re.IGNORECASE)
+
+@functools.lru_cache(maxsize=256)
+def _lowered_brand_names(brand_name: str) -> Optional[Tuple[str, ...]]:
+    """Lowercased brand name and variations for a fast substring check, if all are ASCII"""
+    names = (brand_name, *brand_variations(brand_name, include_unspaced=False))
+    return tuple(name.lower() for name in names) if all(name.isascii() for name in names) else None
+
+@dataclass(frozen=True, slots=True)
+class MentionContext:
+    """Surrounding text of one brand mention"""
+    prompt: str
+    mention: str
+    context: str
+    platform: str
+
+@dataclass(frozen=True, slots=True)
+class SampleMention:
+    """A response that mentions the brand, kept as an example for the platform tab"""
+    prompt: str
+    response: str
+    preview: str
+    mentions: List[str]
+
 class BrandAnalyzer:
     """Analyzes brand mentions in AI platform responses"""
     
     def __init__(self):
-        self.nlp_processor = NLPProcessor()
+        self.nlp_processor = get_nlp_processor()
         self.data_processor = DataProcessor()
         
-    def analyze_mentions(self, platform_responses: Dict[str, List[Dict]], brand_name: str) -> Dict[str, Any]:
+    def analyze_mentions(self, platform_responses: Dict[str, List[Dict]], brand_name: str,
+                         collect_contexts: bool = True) -> Dict[str, Any]:
         """Analyze brand mentions across all platform responses"""
-        analysis_results = {
-            'brand_name': brand_name,
-            'platform_mentions': {},
-            'platform_details': {},
-            'total_mentions': 0,
-            'average_ranking': None,
-            'mention_contexts': [],
-            'sentiment_analysis': {}
-        }
-        
-        all_rankings = []
+        return self.analyze_mentions_multi(platform_responses, [brand_name], collect_contexts)[brand_name]
+    
+    def analyze_mentions_multi(self, platform_responses: Dict[str, List[Dict]], entities: List[str],
+                               collect_contexts: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Analyze mentions of several entities, reading each response once for all of them
+        
+        collect_contexts=False leaves mention_contexts empty for callers that only need the counts.
+        """
+        all_results = {}
+        
+        for entity in entities:
+            all_results[entity] = {
+                'brand_name': entity,
+                'platform_mentions': {},
+                'platform_details': {},
+                'total_mentions': 0,
+                'top_platform': None,
+                'lowest_platform': None,
+                'average_ranking': None,
+                'mention_contexts': [],
+                'sentiment_analysis': {},
+                'sentiment_totals': {'positive': 0, 'neutral': 0, 'negative': 0}
+            }
+        
+        all_rankings = {entity: [] for entity in all_results}
         
         for platform, responses in platform_responses.items():
-            platform_analysis = self._analyze_platform_mentions(responses, brand_name)
-            
-            analysis_results['platform_mentions'][platform] = platform_analysis['mentions']
-            analysis_results['platform_details'][platform] = platform_analysis
-            analysis_results['total_mentions'] += platform_analysis['mentions']
+            platform_analyses = self._analyze_platform_mentions(responses, list(all_results), collect_contexts)
             
-            # Collect rankings for average calculation
-            if platform_analysis['rankings']:
-                all_rankings.extend(platform_analysis['rankings'])
-            
-            # Collect mention contexts
-            analysis_results['mention_contexts'].extend(platform_analysis['mention_contexts'])
-            
-            # Sentiment analysis
-            analysis_results['sentiment_analysis'][platform] = platform_analysis['sentiment']
+            for entity, platform_analysis in platform_analyses.items():
+                analysis_results = all_results[entity]
+                analysis_results['platform_mentions'][platform] = platform_analysis['mentions']
+                analysis_results['platform_details'][platform] = platform_analysis
+                analysis_results['total_mentions'] += platform_analysis['mentions']
+                
+                # Collect rankings for average calculation
+                if platform_analysis['rankings']:
+                    all_rankings[entity].extend(platform_analysis['rankings'])
+                
+                # Collect mention contexts
+                analysis_results['mention_contexts'].extend(platform_analysis['mention_contexts'])
+                
+                # Sentiment analysis, also rolled up across platforms for the scorers
+                analysis_results['sentiment_analysis'][platform] = platform_analysis['sentiment']
+                sentiment_totals = analysis_results['sentiment_totals']
+                for label, count in platform_analysis['sentiment'].items():
+                    sentiment_totals[label] += count
         
-        # Calculate average ranking (as integer)
-        if all_rankings:
-            analysis_results['average_ranking'] = round(sum(all_rankings) / len(all_rankings))
+        for entity, analysis_results in all_results.items():
+            # Calculate average ranking (as integer)
+            rankings = all_rankings[entity]
+            if rankings:
+                analysis_results['average_ranking'] = round(sum(rankings) / len(rankings))
+            
+            # Platforms with the most and fewest mentions, read by the summary export and insights tab
+            platform_mentions = analysis_results['platform_mentions']
+            if platform_mentions:
+                analysis_results['top_platform'] = max(platform_mentions, key=platform_mentions.get)
+                analysis_results['lowest_platform'] = min(platform_mentions, key=platform_mentions.get)
         
-        return analysis_results
+        return all_results
     
-    def _analyze_platform_mentions(self, responses: List[Dict], brand_name: str) -> Dict[str, Any]:
-        """Analyze brand mentions for a specific platform"""
-        platform_analysis = {
-            'mentions': 0,
-            'rankings': [],
-            'mention_contexts': [],
-            'sentiment': {'positive': 0, 'neutral': 0, 'negative': 0},
-            'mention_rate': 0.0,
-            'average_ranking': None,
-            'sample_mentions': []
-        }
+    def _analyze_platform_mentions(self, responses: List[Dict], entities: List[str],
+                                   collect_contexts: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Analyze mentions of each entity for a specific platform"""
+        platform_analyses = {}
+        
+        for entity in entities:
+            platform_analyses[entity] = {
+                'mentions': 0,
+                'rankings': [],
+                'mention_contexts': [],
+                'sentiment': {'positive': 0, 'neutral': 0, 'negative': 0},
+                'mention_rate': 0.0,
+                'average_ranking': None,
+                'sample_mentions': []
+            }
         
         total_responses = len(responses)
+        # entity -> texts of the responses mentioning it, scored for sentiment in one batch
+        matched = {entity: [] for entity in platform_analyses}
+        
+        literals = {entity: self._brand_literals(entity) for entity in platform_analyses}
         
         for response_data in responses:
             response_text = response_data['response']
             prompt = response_data['prompt']
+            # Shared by every entity checked against this response
+            text_lower = response_text.lower()
+            # Substring checks on text_lower agree with the case-insensitive regex unless
+            # the text has one of the few characters lower() folds differently
+            can_prefilter = response_text.isascii() or not any(
+                char in response_text for char in CASE_FOLD_EXCEPTIONS
+            )
             
-            # Check for brand mentions
-            mentions = self._find_brand_mentions(response_text, brand_name)
-            
-            if mentions:
+            for entity, platform_analysis in platform_analyses.items():
+                # Skip the regex scan for entities whose names don't occur at all
+                names = literals[entity]
+                if can_prefilter and names is not None and not any(name in text_lower for name in names):
+                    continue
+                
+                # Check for brand mentions
+                matches = self._find_brand_mentions(response_text, entity)
+                
+                if not matches:
+                    continue
+                mentions = [match.group() for match in matches]
+                
                 # Count this as ONE mention regardless of how many times the brand appears
                 platform_analysis['mentions'] += 1
                 
                 # Analyze ranking if this is a list/comparison response
-                ranking = self._extract_ranking(response_text, brand_name)
+                ranking = self._extract_ranking(response_text, entity, text_lower)
                 if ranking:
                     platform_analysis['rankings'].append(ranking)
                 
-                # Extract mention context
-                for mention in mentions:
-                    context = self._extract_mention_context(response_text, mention)
-                    platform_analysis['mention_contexts'].append({
-                        'prompt': prompt,
-                        'mention': mention,
-                        'context': context,
-                        'platform': response_data.get('platform', 'unknown')
-                    })
+                # Extract mention context at each match's own position
+                if collect_contexts:
+                    for match in matches:
+                        context = self._extract_mention_context(response_text, match.start(), match.end())
+                        platform_analysis['mention_contexts'].append(MentionContext(
+                            prompt=prompt,
+                            mention=match.group(),
+                            context=context,
+                            platform=response_data.get('platform', 'unknown')
+                        ))
                 
-                # Sentiment analysis
-                sentiment = self.nlp_processor.analyze_sentiment(response_text, brand_name)
-                platform_analysis['sentiment'][sentiment] += 1
+                # Queue for sentiment analysis
+                matched[entity].append(response_text)
                 
                 # Store sample mentions
                 if len(platform_analysis['sample_mentions']) < 5:
-                    platform_analysis['sample_mentions'].append({
-                        'prompt': prompt,
-                        'response': response_text,
-                        'mentions': mentions
-                    })
+                    platform_analysis['sample_mentions'].append(SampleMention(
+                        prompt=prompt,
+                        response=response_text,
+                        preview=response_text[:250],  # Shown by the platform tab
+                        mentions=mentions
+                    ))
         
-        # Calculate metrics
-        platform_analysis['mention_rate'] = platform_analysis['mentions'] / total_responses if total_responses > 0 else 0
+        # Sentiment analysis
+        for entity, texts in matched.items():
+            if texts:
+                sentiment = platform_analyses[entity]['sentiment']
+                for label in self.nlp_processor.analyze_sentiment_batch(texts, entity):
+                    sentiment[label] += 1
         
-        if platform_analysis['rankings']:
-            platform_analysis['average_ranking'] = sum(platform_analysis['rankings']) / len(platform_analysis['rankings'])
+        # Calculate metrics
+        for platform_analysis in platform_analyses.values():
+            platform_analysis['mention_rate'] = platform_analysis['mentions'] / total_responses if total_responses > 0 else 0
+            
+            if platform_analysis['rankings']:
+                platform_analysis['average_ranking'] = sum(platform_analysis['rankings']) / len(platform_analysis['rankings'])
         
-        return platform_analysis
+        return platform_analyses
+    
+    def _find_brand_mentions(self, text: str, brand_name: str) -> List[re.Match]:
+        """Find all mentions of the brand in the text, with their positions"""
+        return list(self._brand_pattern(brand_name).finditer(text))
     
-    def _find_brand_mentions(self, text: str, brand_name: str) -> List[str]:
-        """Find all mentions of the brand in the text"""
-        mentions = []
-        
-        # Direct brand name mentions
-        brand_pattern = re.compile(re.escape(brand_name), re.IGNORECASE)
-        direct_mentions = brand_pattern.findall(text)
-        mentions.extend(direct_mentions)
-        
-        # Brand name variations (e.g., "PolicyBazaar" -> "Policy Bazaar")
-        brand_variations = self._generate_brand_variations(brand_name)
-        for variation in brand_variations:
-            variation_pattern = re.compile(re.escape(variation), re.IGNORECASE)
-            variation_mentions = variation_pattern.findall(text)
-            mentions.extend(variation_mentions)
-        
-        return mentions
+    def _brand_pattern(self, brand_name: str) -> re.Pattern:
+        """Single pattern matching the brand name or any variation, built once per brand"""
+        return _compile_mention_pattern(brand_name)
+    
+    def _brand_literals(self, brand_name: str) -> Optional[Tuple[str, ...]]:
+        """Lowercased brand name and variations for a fast substring check, if all are ASCII"""
+        return _lowered_brand_names(brand_name)
     
     def _generate_brand_variations(self, brand_name: str) -> List[str]:
         """Generate possible variations of the brand name"""
-        variations = []
-        
-        # Add space between camelCase
-        spaced_name = re.sub(r'([a-z])([A-Z])', r'\1 \2', brand_name)
-        if spaced_name != brand_name:
-            variations.append(spaced_name)
-        
-        # Common abbreviations
-        words = brand_name.split()
-        if len(words) > 1:
-            # First letter of each word
-            abbreviation = ''.join(word[0].upper() for word in words)
-            variations.append(abbreviation)
-        
-        return variations
+        return list(brand_variations(brand_name, include_unspaced=False))
     
-    def _extract_ranking(self, text: str, brand_name: str) -> Optional[int]:
+    def _extract_ranking(self, text: str, brand_name: str, text_lower: Optional[str] = None) -> Optional[int]:
         """Extract ranking position of the brand in the response"""
-        # Look for numbered lists or ranking indicators
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            if brand_name.lower() in line.lower():
-                # Check for numbered list patterns
-                number_match = re.search(r'^(\d+)\.', line.strip())
-                if number_match:
-                    return int(number_match.group(1))
-                
-                # Check for ranking words
-                ranking_patterns = [
-                    r'(?:first|#1|number one)',
-                    r'(?:second|#2|number two)',
-                    r'(?:third|#3|number three)',
-                    r'(?:fourth|#4|number four)',
-                    r'(?:fifth|#5|number five)'
-                ]
-                
-                for rank, pattern in enumerate(ranking_patterns, 1):
-                    if re.search(pattern, line.lower()):
-                        return rank
+        # Look for numbered lists or ranking indicators on the lines that mention the brand
+        if text_lower is None:
+            text_lower = text.lower()
+        brand_lower = brand_name.lower()
+        
+        position = text_lower.find(brand_lower)
+        while position != -1:
+            line_start = text_lower.rfind('\n', 0, position) + 1
+            line_end = text_lower.find('\n', position)
+            if line_end == -1:
+                line_end = len(text_lower)
+            line = text_lower[line_start:line_end]
+            
+            # Check for numbered list patterns
+            number_match = NUMBERED_ITEM_PATTERN.match(line.strip())
+            if number_match:
+                return int(number_match.group(1))
+            
+            # Check for ranking words, best rank first
+            ranks = [RANK_WORDS[word] for word in RANK_WORD_PATTERN.findall(line)]
+            if ranks:
+                return min(ranks)
+            
+            position = text_lower.find(brand_lower, line_end + 1)
         
         return None
     
-    def _extract_mention_context(self, text: str, mention: str) -> str:
-        """Extract context around a brand mention"""
-        # Find the mention in the text
-        mention_index = text.lower().find(mention.lower())
-        
-        if mention_index == -1:
-            return ""
-        
+    def _extract_mention_context(self, text: str, mention_start: int, mention_end: int) -> str:
+        """Extract context around a brand mention found at text[mention_start:mention_end]"""
         # Extract context (50 characters before and after)
-        start = max(0, mention_index - 50)
-        end = min(len(text), mention_index + len(mention) + 50)
+        start = max(0, mention_start - 50)
+        end = min(len(text), mention_end + 50)
         
         context = text[start:end]
         
@@ -214,11 +297,10 @@ class BrandAnalyzer:
         
         # Sentiment bonus
         sentiment_bonus = 0
-        total_sentiment = sum(analysis_results['sentiment_analysis'].get(platform, {}).values() 
-                            for platform in analysis_results['sentiment_analysis'])
+        sentiment_totals = analysis_results['sentiment_totals']
+        total_sentiment = sum(sentiment_totals.values())
         if total_sentiment > 0:
-            positive_ratio = sum(analysis_results['sentiment_analysis'].get(platform, {}).get('positive', 0) 
-                               for platform in analysis_results['sentiment_analysis']) / total_sentiment
+            positive_ratio = sentiment_totals['positive'] / total_sentiment
             sentiment_bonus = positive_ratio * 10
         
         # Calculate final score
@@ -1,54 +1,29 @@
-from typing import Dict, List, Any
-from utils.nlp_processor import NLPProcessor
+from typing import Dict, List, Any, Optional
 from services.brand_analyzer import BrandAnalyzer
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 class CompetitorAnalyzer:
     """Analyzes competitor mentions and performance"""
     
-    def __init__(self):
-        self.nlp_processor = NLPProcessor()
-        self.brand_analyzer = BrandAnalyzer()
+    def __init__(self, brand_analyzer: Optional[BrandAnalyzer] = None):
+        # Share the brand analyzer (and its loaded NLP model) when the caller already has one
+        self.brand_analyzer = brand_analyzer or BrandAnalyzer()
+        self.nlp_processor = self.brand_analyzer.nlp_processor
         
     def analyze_competitors(self, platform_responses: Dict[str, List[Dict]], competitors: List[str]) -> Dict[str, Any]:
-        """Analyze competitor mentions across all platforms - now with concurrency"""
-        competitor_analysis = {}
-        
-        # Use ThreadPoolExecutor to analyze competitors in parallel
-        with ThreadPoolExecutor(max_workers=min(len(competitors), 5)) as executor:
-            # Submit all competitor analysis tasks
-            future_to_competitor = {
-                executor.submit(self._analyze_single_competitor, platform_responses, competitor): competitor
-                for competitor in competitors
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_competitor):
-                competitor = future_to_competitor[future]
-                try:
-                    result = future.result()
-                    competitor_analysis[competitor] = result
-                except Exception as e:
-                    print(f"Error analyzing competitor {competitor}: {str(e)}")
-                    # Provide fallback data in case of error
-                    competitor_analysis[competitor] = {
-                        'name': competitor,
-                        'total_mentions': 0,
-                        'platform_mentions': {},
-                        'average_ranking': None,
-                        'mention_contexts': [],
-                        'sentiment_analysis': {},
-                        'visibility_score': 0
-                    }
+        """Analyze competitor mentions across all platforms in a single pass over the responses"""
+        # Competitor insights only use counts and rankings, so skip the per-mention contexts.
+        # A failure here affects every competitor at once, so it is left to the caller to report
+        all_results = self.brand_analyzer.analyze_mentions_multi(platform_responses, competitors, collect_contexts=False)
+        
+        competitor_analysis = {
+            competitor: self._to_competitor_analysis(competitor, all_results[competitor])
+            for competitor in competitors
+        }
         
         return competitor_analysis
     
-    def _analyze_single_competitor(self, platform_responses: Dict[str, List[Dict]], competitor: str) -> Dict[str, Any]:
-        """Analyze a single competitor's performance"""
-        # Use the brand analyzer to analyze this competitor as if it were a brand
-        competitor_results = self.brand_analyzer.analyze_mentions(platform_responses, competitor)
-        
-        # Transform results to competitor-specific format
+    def _to_competitor_analysis(self, competitor: str, competitor_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Transform brand-style results for one competitor to the competitor-specific format"""
         competitor_analysis = {
             'name': competitor,
             'total_mentions': competitor_results['total_mentions'],
@@ -64,10 +39,17 @@ class CompetitorAnalyzer:
     def generate_competitive_insights(self, brand_analysis: Dict[str, Any], 
                                     competitor_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Generate competitive insights and recommendations"""
+        # Pivot competitor mentions by platform once for both platform-level analyses
+        competitor_mentions_by_platform = self._competitor_mentions_by_platform(brand_analysis, competitor_analysis)
+        
         insights = {
             'market_position': self._analyze_market_position(brand_analysis, competitor_analysis),
-            'platform_performance': self._analyze_platform_performance(brand_analysis, competitor_analysis),
-            'opportunities': self._identify_opportunities(brand_analysis, competitor_analysis),
+            'platform_performance': self._analyze_platform_performance(
+                brand_analysis, competitor_analysis, competitor_mentions_by_platform
+            ),
+            'opportunities': self._identify_opportunities(
+                brand_analysis, competitor_analysis, competitor_mentions_by_platform
+            ),
             'threats': self._identify_threats(brand_analysis, competitor_analysis),
             'recommendations': self._generate_recommendations(brand_analysis, competitor_analysis)
         }
@@ -110,19 +92,26 @@ class CompetitorAnalyzer:
             'market_rank': self._calculate_market_rank(brand_analysis, competitor_analysis)
         }
     
+    def _competitor_mentions_by_platform(self, brand_analysis: Dict[str, Any],
+                                         competitor_analysis: Dict[str, Any]) -> Dict[str, List[int]]:
+        """Each competitor's mention count per brand platform, in competitor order"""
+        competitor_platform_mentions = [comp_data['platform_mentions'] for comp_data in competitor_analysis.values()]
+        return {
+            platform: [mentions.get(platform, 0) for mentions in competitor_platform_mentions]
+            for platform in brand_analysis['platform_mentions']
+        }
+    
     def _analyze_platform_performance(self, brand_analysis: Dict[str, Any], 
-                                    competitor_analysis: Dict[str, Any]) -> Dict[str, Any]:
+                                    competitor_analysis: Dict[str, Any],
+                                    competitor_mentions_by_platform: Optional[Dict[str, List[int]]] = None) -> Dict[str, Any]:
         """Analyze performance across different platforms"""
         platform_performance = {}
+        if competitor_mentions_by_platform is None:
+            competitor_mentions_by_platform = self._competitor_mentions_by_platform(brand_analysis, competitor_analysis)
         
-        for platform in brand_analysis['platform_mentions'].keys():
-            brand_mentions = brand_analysis['platform_mentions'][platform]
-            
+        for platform, brand_mentions in brand_analysis['platform_mentions'].items():
             # Compare with competitors on this platform
-            competitor_mentions = []
-            for competitor, comp_data in competitor_analysis.items():
-                comp_mentions = comp_data['platform_mentions'].get(platform, 0)
-                competitor_mentions.append(comp_mentions)
+            competitor_mentions = competitor_mentions_by_platform[platform]
             
             if competitor_mentions:
                 avg_competitor_mentions = sum(competitor_mentions) / len(competitor_mentions)
@@ -138,15 +127,16 @@ class CompetitorAnalyzer:
         return platform_performance
     
     def _identify_opportunities(self, brand_analysis: Dict[str, Any], 
-                              competitor_analysis: Dict[str, Any]) -> List[str]:
+                              competitor_analysis: Dict[str, Any],
+                              competitor_mentions_by_platform: Optional[Dict[str, List[int]]] = None) -> List[str]:
         """Identify opportunities for improvement"""
         opportunities = []
+        if competitor_mentions_by_platform is None:
+            competitor_mentions_by_platform = self._competitor_mentions_by_platform(brand_analysis, competitor_analysis)
         
         # Platform-specific opportunities
         for platform, brand_mentions in brand_analysis['platform_mentions'].items():
-            competitor_mentions = []
-            for comp_data in competitor_analysis.values():
-                competitor_mentions.append(comp_data['platform_mentions'].get(platform, 0))
+            competitor_mentions = competitor_mentions_by_platform[platform]
             
             if competitor_mentions:
                 max_competitor_mentions = max(competitor_mentions)
@@ -158,11 +148,7 @@ class CompetitorAnalyzer:
             opportunities.append("Focus on improving search result rankings - currently not in top 3")
         
         # Sentiment opportunities
-        total_negative = sum(
-            sentiment_data.get('negative', 0) 
-            for sentiment_data in brand_analysis['sentiment_analysis'].values()
-        )
-        if total_negative > 0:
+        if brand_analysis['sentiment_totals']['negative'] > 0:
             opportunities.append("Address negative sentiment in AI responses")
         
         return opportunities
@@ -193,34 +179,25 @@ class CompetitorAnalyzer:
         """Generate actionable recommendations"""
         recommendations = []
         
-        # Platform-specific recommendations
-        weakest_platform = min(
-            brand_analysis['platform_mentions'].items(), 
-            key=lambda x: x[1]
-        )[0]
-        recommendations.append(f"Prioritize content strategy for {weakest_platform.upper()} platform")
+        # Platform-specific recommendations (lowest_platform is None when no platform was analyzed)
+        weakest_platform = brand_analysis['lowest_platform']
+        if weakest_platform is not None:
+            recommendations.append(f"Prioritize content strategy for {weakest_platform.upper()} platform")
         
         # Competitor-based recommendations
-        top_competitor = max(
-            competitor_analysis.items(), 
-            key=lambda x: x[1]['total_mentions']
-        )[0]
-        recommendations.append(f"Study {top_competitor}'s content strategy and positioning")
+        if competitor_analysis:
+            top_competitor = max(competitor_analysis, key=lambda competitor: competitor_analysis[competitor]['total_mentions'])
+            recommendations.append(f"Study {top_competitor}'s content strategy and positioning")
         
         # SEO and content recommendations
         if brand_analysis['average_ranking'] and brand_analysis['average_ranking'] > 2:
             recommendations.append("Optimize content for AI training data to improve ranking positions")
         
         # Sentiment recommendations
-        total_sentiment = sum(
-            sum(sentiment_data.values()) 
-            for sentiment_data in brand_analysis['sentiment_analysis'].values()
-        )
+        sentiment_totals = brand_analysis['sentiment_totals']
+        total_sentiment = sum(sentiment_totals.values())
         if total_sentiment > 0:
-            positive_ratio = sum(
-                sentiment_data.get('positive', 0) 
-                for sentiment_data in brand_analysis['sentiment_analysis'].values()
-            ) / total_sentiment
+            positive_ratio = sentiment_totals['positive'] / total_sentiment
             
             if positive_ratio < 0.6:
                 recommendations.append("Improve brand messaging to increase positive sentiment in AI responses")
@@ -230,17 +207,6 @@ class CompetitorAnalyzer:
     def _calculate_market_rank(self, brand_analysis: Dict[str, Any], 
                              competitor_analysis: Dict[str, Any]) -> int:
         """Calculate market rank based on total mentions"""
-        all_entities = [(brand_analysis['brand_name'], brand_analysis['total_mentions'])]
-        
-        for competitor, comp_data in competitor_analysis.items():
-            all_entities.append((competitor, comp_data['total_mentions']))
-        
-        # Sort by mentions (descending)
-        all_entities.sort(key=lambda x: x[1], reverse=True)
-        
-        # Find brand's position
-        for rank, (entity, mentions) in enumerate(all_entities, 1):
-            if entity == brand_analysis['brand_name']:
-                return rank
-        
-        return len(all_entities)
+        # Ties go to the brand, so its rank is one more than the competitors strictly ahead of it
+        brand_mentions = brand_analysis['total_mentions']
+        return 1 + sum(1 for comp_data in competitor_analysis.values() if comp_data['total_mentions'] > brand_mentions)
@@ -1,97 +1,177 @@
+import functools
+import itertools
 import random
-from typing import List, Dict, Optional
+import string
+from collections import ChainMap
+from types import MappingProxyType
+from typing import Iterator, List, Dict, Mapping, Optional, Tuple
 from config.industries import INDUSTRIES
 
+# Template placeholder -> industry config list its value is drawn from
+TEMPLATE_FIELD_TERMS = {
+    'industry': 'terms',
+    'region': 'regions',
+    'business_type': 'business_types',
+    'pain_point': 'pain_points',
+    'action': 'actions',
+    'need': 'needs',
+    'use_case': 'use_cases',
+    'feature': 'features',
+    'capability': 'capabilities',
+    'benefit': 'benefits'
+}
+
+# Rounds of redrawing to replace duplicate prompts before settling for fewer
+MAX_REDRAW_ROUNDS = 5
+
+# Location-aware templates, shared read-only by every generator
+PROMPT_TEMPLATES = MappingProxyType({
+    'direct_comparison': (
+        "What are the best {industry} companies in {region}?",
+        "Which {industry} platforms should I choose in {region}?",
+        "Compare the top {industry} services available in {region}",
+        "List the leading {industry} providers in {region}"
+    ),
+    'recommendation': (
+        "I need recommendations for {industry} solutions in {region}",
+        "What {industry} service would you recommend for a {business_type} in {region}?",
+        "Help me choose the right {industry} platform in {region}",
+        "Which {industry} company offers the best value in {region}?"
+    ),
+    'problem_solving': (
+        "How can I solve {pain_point} using {industry} services in {region}?",
+        "What's the best way to {action} in {industry} in {region}?",
+        "I'm looking for {industry} solutions in {region} that can help with {need}",
+        "How do I choose the right {industry} provider for {use_case} in {region}?"
+    ),
+    'feature_specific': (
+        "Which {industry} companies in {region} offer {feature}?",
+        "What {industry} platforms in {region} have the best {capability}?",
+        "Compare {feature} across different {industry} providers in {region}",
+        "Find {industry} services in {region} with strong {benefit}"
+    ),
+    'buying_journey': (
+        "How do I get started with {industry} services in {region}?",
+        "What should I look for when choosing {industry} providers in {region}?",
+        "Steps to implement {industry} solutions in my business in {region}",
+        "Beginner's guide to {industry} platforms in {region}"
+    )
+})
+
+# Location-agnostic templates for when no location is specified
+GENERIC_TEMPLATES = MappingProxyType({
+    'direct_comparison': (
+        "What are the best {industry} companies?",
+        "Which {industry} platforms should I choose?",
+        "Compare the top {industry} services available today",
+        "List the leading {industry} providers"
+    ),
+    'recommendation': (
+        "I need recommendations for {industry} solutions",
+        "What {industry} service would you recommend for a {business_type}?",
+        "Help me choose the right {industry} platform",
+        "Which {industry} company offers the best value?"
+    ),
+    'problem_solving': (
+        "How can I solve {pain_point} using {industry} services?",
+        "What's the best way to {action} in {industry}?",
+        "I'm looking for {industry} solutions that can help with {need}",
+        "How do I choose the right {industry} provider for {use_case}?"
+    ),
+    'feature_specific': (
+        "Which {industry} companies offer {feature}?",
+        "What {industry} platforms have the best {capability}?",
+        "Compare {feature} across different {industry} providers",
+        "Find {industry} services with strong {benefit}"
+    ),
+    'buying_journey': (
+        "How do I get started with {industry} services?",
+        "What should I look for when choosing {industry} providers?",
+        "Steps to implement {industry} solutions in my business",
+        "Beginner's guide to {industry} platforms"
+    )
+})
+
+def _parse_fields(template: str) -> Tuple[str, ...]:
+    """Distinct placeholder names in a template, in order of appearance"""
+    fields = (field for _, field, _, _ in string.Formatter().parse(template) if field)
+    return tuple(dict.fromkeys(fields))
+
+# Placeholder names of each template, parsed once so a batch only draws the terms it uses
+TEMPLATE_FIELDS = MappingProxyType({
+    template: _parse_fields(template)
+    for templates in (PROMPT_TEMPLATES, GENERIC_TEMPLATES)
+    for category_templates in templates.values()
+    for template in category_templates
+})
+
+@functools.lru_cache(maxsize=256)
+def _build_custom_industry_config(industry_name: str) -> Mapping[str, Tuple[str, ...]]:
+    """Read-only configuration for a custom industry, built once per industry"""
+    # A location never needs to be folded in here: generate_prompts layers it over regions
+    return MappingProxyType({
+        'terms': (industry_name.lower(), industry_name, f'{industry_name} solutions', f'{industry_name} services'),
+        'regions': ('globally', 'internationally', 'in the market'),
+        'business_types': (
+            'startup', 'enterprise', 'small business', 'individual',
+            'corporation', 'SME', 'organization', 'company'
+        ),
+        'pain_points': (
+            'high costs', 'inefficiency', 'poor service quality',
+            'limited options', 'complex processes', 'lack of transparency',
+            'scalability issues', 'integration challenges'
+        ),
+        'actions': (
+            'find solutions', 'compare options', 'get services', 'improve processes',
+            'reduce costs', 'increase efficiency', 'solve problems', 'get started'
+        ),
+        'needs': (
+            'better solutions', 'cost optimization', 'process improvement',
+            'quality service', 'reliable providers', 'trusted partners',
+            'innovative approaches', 'competitive advantage'
+        ),
+        'use_cases': (
+            'business operations', 'service delivery', 'customer needs',
+            'market requirements', 'industry challenges', 'growth objectives',
+            'efficiency goals', 'competitive positioning'
+        ),
+        'features': (
+            'quality service', 'competitive pricing', 'reliability',
+            'customer support', 'innovation', 'flexibility',
+            'scalability', 'expertise'
+        ),
+        'capabilities': (
+            'service delivery', 'problem solving', 'customer satisfaction',
+            'operational excellence', 'market expertise', 'industry knowledge',
+            'proven track record', 'professional service'
+        ),
+        'benefits': (
+            'cost savings', 'better outcomes', 'improved efficiency',
+            'competitive advantage', 'customer satisfaction', 'growth potential',
+            'market leadership', 'operational excellence'
+        )
+    })
+
 class PromptGenerator:
     """Generates industry-specific prompts for brand visibility analysis"""
     
     def __init__(self):
-        self.prompt_templates = {
-            'direct_comparison': [
-                "What are the best {industry} companies in {region}?",
-                "Which {industry} platforms should I choose in {region}?",
-                "Compare the top {industry} services available in {region}",
-                "List the leading {industry} providers in {region}"
-            ],
-            'recommendation': [
-                "I need recommendations for {industry} solutions in {region}",
-                "What {industry} service would you recommend for a {business_type} in {region}?",
-                "Help me choose the right {industry} platform in {region}",
-                "Which {industry} company offers the best value in {region}?"
-            ],
-            'problem_solving': [
-                "How can I solve {pain_point} using {industry} services in {region}?",
-                "What's the best way to {action} in {industry} in {region}?",
-                "I'm looking for {industry} solutions in {region} that can help with {need}",
-                "How do I choose the right {industry} provider for {use_case} in {region}?"
-            ],
-            'feature_specific': [
-                "Which {industry} companies in {region} offer {feature}?",
-                "What {industry} platforms in {region} have the best {capability}?",
-                "Compare {feature} across different {industry} providers in {region}",
-                "Find {industry} services in {region} with strong {benefit}"
-            ],
-            'buying_journey': [
-                "How do I get started with {industry} services in {region}?",
-                "What should I look for when choosing {industry} providers in {region}?",
-                "Steps to implement {industry} solutions in my business in {region}",
-                "Beginner's guide to {industry} platforms in {region}"
-            ]
-        }
-        
-        # Location-agnostic templates for when no location is specified
-        self.generic_templates = {
-            'direct_comparison': [
-                "What are the best {industry} companies?",
-                "Which {industry} platforms should I choose?",
-                "Compare the top {industry} services available today",
-                "List the leading {industry} providers"
-            ],
-            'recommendation': [
-                "I need recommendations for {industry} solutions",
-                "What {industry} service would you recommend for a {business_type}?",
-                "Help me choose the right {industry} platform",
-                "Which {industry} company offers the best value?"
-            ],
-            'problem_solving': [
-                "How can I solve {pain_point} using {industry} services?",
-                "What's the best way to {action} in {industry}?",
-                "I'm looking for {industry} solutions that can help with {need}",
-                "How do I choose the right {industry} provider for {use_case}?"
-            ],
-            'feature_specific': [
-                "Which {industry} companies offer {feature}?",
-                "What {industry} platforms have the best {capability}?",
-                "Compare {feature} across different {industry} providers",
-                "Find {industry} services with strong {benefit}"
-            ],
-            'buying_journey': [
-                "How do I get started with {industry} services?",
-                "What should I look for when choosing {industry} providers?",
-                "Steps to implement {industry} solutions in my business",
-                "Beginner's guide to {industry} platforms"
-            ]
-        }
+        # Shared, read-only templates
+        self.prompt_templates = PROMPT_TEMPLATES
+        self.generic_templates = GENERIC_TEMPLATES
     
     def generate_prompts(self, industry: str, count: int = 20, location: Optional[str] = None, is_custom: bool = False) -> List[str]:
-        """Generate industry-specific prompts"""
-        if is_custom:
-            # Generate custom industry config
-            industry_config = self._generate_custom_industry_config(industry, location)
-        else:
-            if industry not in INDUSTRIES:
-                raise ValueError(f"Industry {industry} not supported")
-            industry_config = INDUSTRIES[industry].copy()
-            
-            # Add location to regions if provided
-            if location:
-                if 'regions' in industry_config:
-                    # Add the specific location to the front of regions list
-                    industry_config['regions'] = [location] + [r for r in industry_config['regions'] if r != location]
-                else:
-                    industry_config['regions'] = [location, 'globally', 'internationally']
+        """Generate industry-specific prompts
         
-        prompts = []
+        Returns `count` distinct prompts, or fewer only when the templates and terms can't
+        form that many distinct prompts at all.
+        """
+        industry_config = self._get_industry_config(industry, is_custom)
+        
+        # Every location-aware template has a {region} slot, so filling it with the location
+        # puts the location in each prompt (layered over the shared read-only config, not copied)
+        if location:
+            industry_config = ChainMap({'regions': (location,)}, industry_config)
         
         # Determine which templates to use based on location availability
         templates_to_use = self.prompt_templates if location else self.generic_templates
@@ -100,77 +180,71 @@ class PromptGenerator:
         categories = list(templates_to_use.keys())
         prompts_per_category = max(1, count // len(categories))
         
+        templates = []
         for category in categories:
-            category_prompts = self._generate_category_prompts(
-                category, industry_config, prompts_per_category, has_location=bool(location)
-            )
-            prompts.extend(category_prompts)
+            templates.extend(random.choices(templates_to_use[category], k=prompts_per_category))
         
-        # Add extra prompts if needed
-        while len(prompts) < count:
-            category = random.choice(categories)
-            extra_prompt = self._generate_category_prompts(
-                category, industry_config, 1, has_location=bool(location)
-            )
-            prompts.extend(extra_prompt)
+        # Add extra prompts from random categories if needed
+        templates.extend(self._draw_templates(templates_to_use, count - len(templates)))
         
-        # Validate prompts include location when specified
-        final_prompts = []
-        for prompt in prompts[:count]:
-            # If location is provided and not in prompt, try to add it
-            if location and location not in prompt:
-                # Try to add location context at the end
-                if prompt.endswith('?'):
-                    prompt = prompt[:-1] + f" in {location}?"
-                else:
-                    prompt = prompt + f" in {location}"
-            final_prompts.append(prompt)
+        # Fill everything in one batch, dropping any surplus before it is filled; dict keys
+        # drop duplicate prompts as they are collected, keeping first-seen order
+        prompts = dict.fromkeys(self._fill_templates(templates[:count], industry_config))
         
-        return final_prompts
-    
-    def _generate_category_prompts(self, category: str, industry_config: Dict, count: int, has_location: bool = True) -> List[str]:
-        """Generate prompts for a specific category"""
-        # Use location-aware templates if location is provided, otherwise use generic templates
-        templates = self.prompt_templates[category] if has_location else self.generic_templates[category]
-        prompts = []
+        # Redraw from random categories to replace duplicates, giving up after a few rounds
+        # in case a small custom config can't produce enough distinct prompts
+        for _ in range(MAX_REDRAW_ROUNDS):
+            missing = count - len(prompts)
+            if missing <= 0:
+                break
+            prompts.update(dict.fromkeys(
+                self._fill_templates(self._draw_templates(templates_to_use, missing), industry_config)
+            ))
         
-        for _ in range(count):
-            template = random.choice(templates)
-            prompt = self._fill_template(template, industry_config)
-            prompts.append(prompt)
+        # Still short after redrawing (e.g. a custom industry whose regions collapse to the
+        # location): walk the remaining combinations in a fixed order instead of leaving a gap
+        if len(prompts) < count:
+            for prompt in self._enumerate_prompts(templates_to_use, industry_config):
+                prompts[prompt] = None
+                if len(prompts) >= count:
+                    break
         
-        return prompts
+        return list(prompts)[:count]
+    
+    def _draw_templates(self, templates_to_use: Mapping[str, Tuple[str, ...]], count: int) -> List[str]:
+        """Pick templates from random categories"""
+        categories = list(templates_to_use)
+        return [random.choice(templates_to_use[category]) for category in random.choices(categories, k=max(0, count))]
     
-    def _fill_template(self, template: str, industry_config: Dict) -> str:
-        """Fill a template with industry-specific information"""
-        # Replace placeholders with industry-specific terms
-        replacements = {
-            'industry': random.choice(industry_config['terms']),
-            'region': random.choice(industry_config['regions']),
-            'business_type': random.choice(industry_config['business_types']),
-            'pain_point': random.choice(industry_config['pain_points']),
-            'action': random.choice(industry_config['actions']),
-            'need': random.choice(industry_config['needs']),
-            'use_case': random.choice(industry_config['use_cases']),
-            'feature': random.choice(industry_config['features']),
-            'capability': random.choice(industry_config['capabilities']),
-            'benefit': random.choice(industry_config['benefits'])
+    def _enumerate_prompts(self, templates_to_use: Mapping[str, Tuple[str, ...]], industry_config: Mapping) -> Iterator[str]:
+        """Every fill of every template, in a fixed order, produced lazily"""
+        for category_templates in templates_to_use.values():
+            for template in category_templates:
+                fields = TEMPLATE_FIELDS.get(template) or _parse_fields(template)
+                term_lists = (industry_config[TEMPLATE_FIELD_TERMS[field]] for field in fields)
+                for terms in itertools.product(*term_lists):
+                    yield template.format_map(dict(zip(fields, terms)))
+    
+    def _fill_templates(self, templates: List[str], industry_config: Mapping) -> List[str]:
+        """Fill templates with industry-specific information"""
+        # Draw the terms for each placeholder across the whole batch at once; the config
+        # is only looked up per placeholder, not per prompt
+        fields = [TEMPLATE_FIELDS.get(template) or _parse_fields(template) for template in templates]
+        picks = {
+            field: random.choices(industry_config[TEMPLATE_FIELD_TERMS[field]], k=len(templates))
+            for field in dict.fromkeys(field for template_fields in fields for field in template_fields)
         }
         
-        # Replace placeholders in template
-        filled_template = template
-        for placeholder, value in replacements.items():
-            filled_template = filled_template.replace(f'{{{placeholder}}}', value)
-        
-        return filled_template
+        # Fill the i-th template with the i-th term drawn for each placeholder it uses
+        return [
+            template.format_map({field: picks[field][i] for field in template_fields})
+            for i, (template, template_fields) in enumerate(zip(templates, fields))
+        ]
     
     def generate_competitor_analysis_prompts(self, industry: str, brand_name: str, competitors: List[str], location: Optional[str] = None) -> List[str]:
         """Generate prompts specifically for competitor analysis"""
-        if industry in INDUSTRIES:
-            industry_config = INDUSTRIES[industry]
-        else:
-            # Custom industry
-            industry_config = self._generate_custom_industry_config(industry, location)
+        # Unknown industries are treated as custom ones
+        industry_config = self._get_industry_config(industry, industry not in INDUSTRIES)
             
         competitor_prompts = []
         
@@ -196,62 +270,20 @@ class PromptGenerator:
     
     def validate_prompts(self, prompts: List[str]) -> List[str]:
         """Validate and clean generated prompts"""
-        valid_prompts = []
-        
-        for prompt in prompts:
-            # Remove prompts with unfilled placeholders
-            if '{' not in prompt and '}' not in prompt:
-                # Remove duplicates
-                if prompt not in valid_prompts:
-                    valid_prompts.append(prompt)
-        
-        return valid_prompts
+        # Remove prompts with unfilled placeholders, then duplicates (dict keys keep first-seen order)
+        filled_prompts = (prompt for prompt in prompts if '{' not in prompt and '}' not in prompt)
+        return list(dict.fromkeys(filled_prompts))
+    
+    def _get_industry_config(self, industry: str, is_custom: bool) -> Mapping[str, Tuple[str, ...]]:
+        """Shared config of a built-in industry, or the cached one of a custom industry"""
+        if is_custom:
+            # Generate custom industry config
+            return self._generate_custom_industry_config(industry)
+        try:
+            return INDUSTRIES[industry]
+        except KeyError:
+            raise ValueError(f"Industry {industry} not supported") from None
     
-    def _generate_custom_industry_config(self, industry_name: str, location: Optional[str] = None) -> Dict:
+    def _generate_custom_industry_config(self, industry_name: str) -> Mapping[str, Tuple[str, ...]]:
         """Generate configuration for custom industries"""
-        regions = ['globally', 'internationally', 'in the market']
-        if location:
-            regions = [location] + regions
-        
-        return {
-            'terms': [industry_name.lower(), industry_name, f'{industry_name} solutions', f'{industry_name} services'],
-            'regions': regions,
-            'business_types': [
-                'startup', 'enterprise', 'small business', 'individual',
-                'corporation', 'SME', 'organization', 'company'
-            ],
-            'pain_points': [
-                'high costs', 'inefficiency', 'poor service quality',
-                'limited options', 'complex processes', 'lack of transparency',
-                'scalability issues', 'integration challenges'
-            ],
-            'actions': [
-                'find solutions', 'compare options', 'get services', 'improve processes',
-                'reduce costs', 'increase efficiency', 'solve problems', 'get started'
-            ],
-            'needs': [
-                'better solutions', 'cost optimization', 'process improvement',
-                'quality service', 'reliable providers', 'trusted partners',
-                'innovative approaches', 'competitive advantage'
-            ],
-            'use_cases': [
-                'business operations', 'service delivery', 'customer needs',
-                'market requirements', 'industry challenges', 'growth objectives',
-                'efficiency goals', 'competitive positioning'
-            ],
-            'features': [
-                'quality service', 'competitive pricing', 'reliability',
-                'customer support', 'innovation', 'flexibility',
-                'scalability', 'expertise'
-            ],
-            'capabilities': [
-                'service delivery', 'problem solving', 'customer satisfaction',
-                'operational excellence', 'market expertise', 'industry knowledge',
-                'proven track record', 'professional service'
-            ],
-            'benefits': [
-                'cost savings', 'better outcomes', 'improved efficiency',
-                'competitive advantage', 'customer satisfaction', 'growth potential',
-                'market leadership', 'operational excellence'
-            ]
-        }
+        return _build_custom_industry_config(industry_name)
@@ -1,6 +1,42 @@
 from typing import Dict, List, Any
+import bisect
 import math
 
+# Upper bounds of the average ranking bands and each band's score (lower ranking = higher score);
+# anything past the last bound scores RANKING_SCORES[-1]
+RANKING_BOUNDS = (1, 2, 3, 5, 10)
+RANKING_SCORES = (100, 85, 70, 50, 25, 10)
+
+# Component -> (ascending minimum scores of the upper bands, explanation per band from lowest up)
+SCORE_BREAKDOWN_BANDS = {
+    'mention_frequency': ((40, 60, 80), (
+        "Low mention frequency - immediate action required",
+        "Moderate mention frequency - needs attention",
+        "Good mention frequency with room for improvement",
+        "Excellent mention frequency across platforms"
+    )),
+    'ranking_position': ((60, 80), (
+        "Poor ranking positions - focus on SEO optimization",
+        "Good ranking positions with improvement potential",
+        "Excellent ranking positions in AI responses"
+    )),
+    'platform_coverage': ((60, 80), (
+        "Limited platform coverage - expand presence",
+        "Good platform coverage with some gaps",
+        "Strong presence across multiple AI platforms"
+    )),
+    'sentiment_quality': ((50, 70), (
+        "Negative sentiment - address messaging issues",
+        "Neutral sentiment - opportunity for improvement",
+        "Positive sentiment in AI responses"
+    )),
+    'competitive_position': ((50, 70), (
+        "Lagging behind competitors - strategic focus needed",
+        "Competitive position with room for growth",
+        "Leading competitive position"
+    ))
+}
+
 class VisibilityScorer:
     """Calculates overall visibility scores and generates insights"""
     
@@ -24,14 +60,15 @@ class VisibilityScorer:
         sentiment_score = self._calculate_sentiment_score(brand_analysis)
         competitive_score = self._calculate_competitive_score(brand_analysis, competitor_analysis)
         
-        # Calculate weighted overall score
-        overall_score = (
-            mention_score * self.weights['mention_frequency'] +
-            ranking_score * self.weights['ranking_position'] +
-            platform_score * self.weights['platform_coverage'] +
-            sentiment_score * self.weights['sentiment_quality'] +
-            competitive_score * self.weights['competitive_position']
-        )
+        # Calculate weighted overall score, summing in weight order
+        component_scores = {
+            'mention_frequency': mention_score,
+            'ranking_position': ranking_score,
+            'platform_coverage': platform_score,
+            'sentiment_quality': sentiment_score,
+            'competitive_position': competitive_score
+        }
+        overall_score = sum(component_scores[component] * weight for component, weight in self.weights.items())
         
         # Generate insights and recommendations
         insights = self._generate_insights(brand_analysis, competitor_analysis)
@@ -39,13 +76,7 @@ class VisibilityScorer:
         
         return {
             'overall_score': round(overall_score, 1),
-            'component_scores': {
-                'mention_frequency': round(mention_score, 1),
-                'ranking_position': round(ranking_score, 1),
-                'platform_coverage': round(platform_score, 1),
-                'sentiment_quality': round(sentiment_score, 1),
-                'competitive_position': round(competitive_score, 1)
-            },
+            'component_scores': {component: round(score, 1) for component, score in component_scores.items()},
             'insights': insights,
             'recommendations': recommendations,
             'score_breakdown': self._generate_score_breakdown(
@@ -82,67 +113,51 @@ class VisibilityScorer:
         if avg_ranking is None:
             return 0.0
         
-        # Convert ranking to score (lower ranking = higher score)
-        # Rank 1 = 100, Rank 2 = 85, Rank 3 = 70, etc.
-        if avg_ranking <= 1:
-            score = 100
-        elif avg_ranking <= 2:
-            score = 85
-        elif avg_ranking <= 3:
-            score = 70
-        elif avg_ranking <= 5:
-            score = 50
-        elif avg_ranking <= 10:
-            score = 25
-        else:
-            score = 10
-        
-        return score
+        # Convert ranking to score: Rank 1 = 100, Rank 2 = 85, Rank 3 = 70, etc.
+        return RANKING_SCORES[bisect.bisect_left(RANKING_BOUNDS, avg_ranking)]
     
     def _calculate_platform_score(self, brand_analysis: Dict[str, Any]) -> float:
         """Calculate score based on platform coverage"""
         platform_mentions = brand_analysis['platform_mentions']
         
-        # Check how many platforms have mentions
-        platforms_with_mentions = sum(1 for mentions in platform_mentions.values() if mentions > 0)
         total_platforms = len(platform_mentions)
         
         if total_platforms == 0:
             return 0.0
         
+        # Count, sum and sum of squares of the non-zero platforms in one pass
+        platforms_with_mentions = mention_sum = mention_sum_sq = 0
+        for mentions in platform_mentions.values():
+            if mentions > 0:
+                platforms_with_mentions += 1
+                mention_sum += mentions
+                mention_sum_sq += mentions * mentions
+        
         # Base score from platform coverage
         coverage_score = (platforms_with_mentions / total_platforms) * 100
         
         # Bonus for consistent performance across platforms
-        if platforms_with_mentions > 0:
-            mention_values = [mentions for mentions in platform_mentions.values() if mentions > 0]
-            if len(mention_values) > 1:
-                # Calculate coefficient of variation (lower = more consistent)
-                mean_mentions = sum(mention_values) / len(mention_values)
-                std_dev = math.sqrt(sum((x - mean_mentions) ** 2 for x in mention_values) / len(mention_values))
-                cv = std_dev / mean_mentions if mean_mentions > 0 else 0
-                
-                # Bonus for consistency (up to 20 points)
-                consistency_bonus = max(0, 20 - (cv * 20))
-                coverage_score = min(100, coverage_score + consistency_bonus)
+        if platforms_with_mentions > 1:
+            # Calculate coefficient of variation (lower = more consistent); the variance numerator
+            # stays exact for integer counts, so it can't dip below zero from rounding
+            mean_mentions = mention_sum / platforms_with_mentions
+            variance = (platforms_with_mentions * mention_sum_sq - mention_sum * mention_sum) / platforms_with_mentions ** 2
+            std_dev = math.sqrt(max(0, variance))
+            cv = std_dev / mean_mentions  # mean of positive counts, never zero
+            
+            # Bonus for consistency (up to 20 points)
+            consistency_bonus = max(0, 20 - (cv * 20))
+            coverage_score = min(100, coverage_score + consistency_bonus)
         
         return coverage_score
     
     def _calculate_sentiment_score(self, brand_analysis: Dict[str, Any]) -> float:
         """Calculate score based on sentiment quality"""
-        sentiment_analysis = brand_analysis.get('sentiment_analysis', {})
-        
-        if not sentiment_analysis:
-            return 50.0  # Neutral score if no sentiment data
+        sentiment_totals = brand_analysis.get('sentiment_totals', {})
         
-        total_positive = 0
-        total_neutral = 0
-        total_negative = 0
-        
-        for platform_sentiment in sentiment_analysis.values():
-            total_positive += platform_sentiment.get('positive', 0)
-            total_neutral += platform_sentiment.get('neutral', 0)
-            total_negative += platform_sentiment.get('negative', 0)
+        total_positive = sentiment_totals.get('positive', 0)
+        total_neutral = sentiment_totals.get('neutral', 0)
+        total_negative = sentiment_totals.get('negative', 0)
         
         total_sentiment = total_positive + total_neutral + total_negative
         
@@ -166,22 +181,13 @@ class VisibilityScorer:
         if not competitor_analysis:
             return 50.0  # Neutral score if no competitor data
         
-        # Calculate relative position
-        better_than = 0
-        total_competitors = len(competitor_analysis)
-        
-        for competitor_data in competitor_analysis.values():
-            competitor_mentions = competitor_data['total_mentions']
-            
-            if brand_mentions > competitor_mentions:
-                better_than += 1
-            elif brand_mentions == competitor_mentions:
-                better_than += 0.5  # Tie
+        # Calculate relative position: a full point per competitor behind, half per tie
+        competitor_mentions = [competitor_data['total_mentions'] for competitor_data in competitor_analysis.values()]
+        better_than = sum(mentions < brand_mentions for mentions in competitor_mentions)
+        better_than += 0.5 * competitor_mentions.count(brand_mentions)
         
         # Calculate competitive score
-        competitive_score = (better_than / total_competitors) * 100 if total_competitors > 0 else 50
-        
-        return competitive_score
+        return (better_than / len(competitor_mentions)) * 100
     
     def _generate_insights(self, brand_analysis: Dict[str, Any], 
                           competitor_analysis: Dict[str, Any]) -> List[str]:
@@ -200,8 +206,9 @@ class VisibilityScorer:
         # Platform performance insights
         platform_mentions = brand_analysis['platform_mentions']
         if platform_mentions:
-            best_platform = max(platform_mentions, key=platform_mentions.get)
-            worst_platform = min(platform_mentions, key=platform_mentions.get)
+            # Picked once by the brand analyzer
+            best_platform = brand_analysis['top_platform']
+            worst_platform = brand_analysis['lowest_platform']
             
             insights.append(f"{best_platform.upper()} is your strongest platform with {platform_mentions[best_platform]} mentions")
             if platform_mentions[worst_platform] < platform_mentions[best_platform] * 0.5:
@@ -233,8 +240,8 @@ class VisibilityScorer:
         # Platform-specific recommendations
         platform_mentions = brand_analysis['platform_mentions']
         if platform_mentions:
-            worst_platform = min(platform_mentions, key=platform_mentions.get)
-            if platform_mentions[worst_platform] < max(platform_mentions.values()) * 0.5:
+            worst_platform = brand_analysis['lowest_platform']
+            if platform_mentions[worst_platform] < platform_mentions[brand_analysis['top_platform']] * 0.5:
                 recommendations.append(f"Develop targeted content strategy for {worst_platform.upper()} to improve visibility")
         
         # Mention frequency recommendations
@@ -253,14 +260,8 @@ class VisibilityScorer:
                 recommendations.append(f"Analyze {top_competitor[0]}'s content strategy and digital presence")
         
         # Sentiment recommendations
-        sentiment_analysis = brand_analysis.get('sentiment_analysis', {})
-        if sentiment_analysis:
-            total_negative = sum(
-                platform_sentiment.get('negative', 0) 
-                for platform_sentiment in sentiment_analysis.values()
-            )
-            if total_negative > 0:
-                recommendations.append("Address negative sentiment through improved brand messaging and PR")
+        if brand_analysis.get('sentiment_totals', {}).get('negative', 0) > 0:
+            recommendations.append("Address negative sentiment through improved brand messaging and PR")
         
         # General recommendations
         recommendations.append("Regularly monitor AI platform responses to track visibility changes")
@@ -272,48 +273,16 @@ class VisibilityScorer:
                                 platform_score: float, sentiment_score: float, 
                                 competitive_score: float) -> Dict[str, str]:
         """Generate detailed score breakdown explanations"""
-        breakdown = {}
-        
-        # Mention frequency breakdown
-        if mention_score >= 80:
-            breakdown['mention_frequency'] = "Excellent mention frequency across platforms"
-        elif mention_score >= 60:
-            breakdown['mention_frequency'] = "Good mention frequency with room for improvement"
-        elif mention_score >= 40:
-            breakdown['mention_frequency'] = "Moderate mention frequency - needs attention"
-        else:
-            breakdown['mention_frequency'] = "Low mention frequency - immediate action required"
-        
-        # Ranking breakdown
-        if ranking_score >= 80:
-            breakdown['ranking_position'] = "Excellent ranking positions in AI responses"
-        elif ranking_score >= 60:
-            breakdown['ranking_position'] = "Good ranking positions with improvement potential"
-        else:
-            breakdown['ranking_position'] = "Poor ranking positions - focus on SEO optimization"
-        
-        # Platform coverage breakdown
-        if platform_score >= 80:
-            breakdown['platform_coverage'] = "Strong presence across multiple AI platforms"
-        elif platform_score >= 60:
-            breakdown['platform_coverage'] = "Good platform coverage with some gaps"
-        else:
-            breakdown['platform_coverage'] = "Limited platform coverage - expand presence"
-        
-        # Sentiment breakdown
-        if sentiment_score >= 70:
-            breakdown['sentiment_quality'] = "Positive sentiment in AI responses"
-        elif sentiment_score >= 50:
-            breakdown['sentiment_quality'] = "Neutral sentiment - opportunity for improvement"
-        else:
-            breakdown['sentiment_quality'] = "Negative sentiment - address messaging issues"
-        
-        # Competitive breakdown
-        if competitive_score >= 70:
-            breakdown['competitive_position'] = "Leading competitive position"
-        elif competitive_score >= 50:
-            breakdown['competitive_position'] = "Competitive position with room for growth"
-        else:
-            breakdown['competitive_position'] = "Lagging behind competitors - strategic focus needed"
-        
-        return breakdown
+        scores = {
+            'mention_frequency': mention_score,
+            'ranking_position': ranking_score,
+            'platform_coverage': platform_score,
+            'sentiment_quality': sentiment_score,
+            'competitive_position': competitive_score
+        }
+        
+        # A score on a band's minimum belongs to that band, hence bisect_right
+        return {
+            component: messages[bisect.bisect_right(bounds, scores[component])]
+            for component, (bounds, messages) in SCORE_BREAKDOWN_BANDS.items()
+        }
@@ -1,9 +1,15 @@
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional
+import bisect
 import json
+import orjson
 from datetime import datetime
 
+# Upper bounds of the average ranking bands that earn a platform bonus, and each band's bonus
+RANKING_BONUS_BOUNDS = (2, 3, 5)
+RANKING_BONUSES = (20, 10, 5, 0)
+
 class DataProcessor:
     """Data processing utilities for brand analysis"""
     
@@ -12,20 +18,30 @@ class DataProcessor:
     
     def process_platform_responses(self, responses: Dict[str, List[Dict]]) -> pd.DataFrame:
         """Process platform responses into a structured DataFrame"""
-        data = []
+        # Build the columns directly with declared dtypes so pandas doesn't infer them row by row
+        platforms, prompt_ids, prompts, texts = [], [], [], []
         
         for platform, platform_responses in responses.items():
             for i, response_data in enumerate(platform_responses):
-                data.append({
-                    'platform': platform,
-                    'prompt_id': i,
-                    'prompt': response_data['prompt'],
-                    'response': response_data['response'],
-                    'response_length': len(response_data['response']),
-                    'timestamp': datetime.now().isoformat()
-                })
-        
-        return pd.DataFrame(data)
+                platforms.append(platform)
+                prompt_ids.append(i)
+                prompts.append(response_data['prompt'])
+                texts.append(response_data['response'])
+        
+        df = pd.DataFrame({
+            'platform': pd.Categorical(platforms),
+            'prompt_id': np.array(prompt_ids, dtype=np.int32),
+            # Arrow-backed strings keep the long texts out of per-row Python objects
+            'prompt': pd.array(prompts, dtype=pd.StringDtype('pyarrow')),
+            'response': pd.array(texts, dtype=pd.StringDtype('pyarrow'))
+        }, index=pd.RangeIndex(len(texts)))
+        
+        # Lengths come from Arrow's string kernel over the whole column
+        df['response_length'] = df['response'].str.len().astype(np.int32)
+        # Every row is processed in the same call, so they share one timestamp
+        df['timestamp'] = datetime.now().isoformat()
+        
+        return self._downcast(df)
     
     def calculate_mention_statistics(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate statistical metrics for brand mentions"""
@@ -38,23 +54,22 @@ class DataProcessor:
         
         brand_analysis = analysis_data.get('brand_analysis', {})
         platform_mentions = brand_analysis.get('platform_mentions', {})
+        platform_details = brand_analysis.get('platform_details', {})
         
         # Total mentions
-        stats['total_mentions'] = sum(platform_mentions.values())
+        total_mentions = stats['total_mentions'] = sum(platform_mentions.values())
         
-        # Platform distribution
-        if stats['total_mentions'] > 0:
-            for platform, mentions in platform_mentions.items():
-                stats['platform_distribution'][platform] = mentions / stats['total_mentions']
-        
-        # Platform performance metrics
+        # Platform distribution and performance metrics in one pass
         for platform, mentions in platform_mentions.items():
-            platform_details = brand_analysis.get('platform_details', {}).get(platform, {})
+            if total_mentions > 0:
+                stats['platform_distribution'][platform] = mentions / total_mentions
+            
+            details = platform_details.get(platform, {})
             stats['platform_performance'][platform] = {
                 'mentions': mentions,
-                'mention_rate': platform_details.get('mention_rate', 0.0),
-                'average_ranking': platform_details.get('average_ranking'),
-                'performance_score': self._calculate_platform_performance_score(platform_details)
+                'mention_rate': details.get('mention_rate', 0.0),
+                'average_ranking': details.get('average_ranking'),
+                'performance_score': self._calculate_platform_performance_score(details)
             }
         
         return stats
@@ -62,38 +77,25 @@ class DataProcessor:
     def create_comparison_matrix(self, brand_analysis: Dict[str, Any], 
                                competitor_analysis: Dict[str, Any]) -> pd.DataFrame:
         """Create a comparison matrix for brand vs competitors"""
-        data = []
-        
-        # Add brand data
-        brand_data = {
-            'entity': brand_analysis['brand_name'],
-            'type': 'brand',
-            'total_mentions': brand_analysis['total_mentions'],
-            'average_ranking': brand_analysis.get('average_ranking', 0)
-        }
+        # One list per column, brand row first, then a row per competitor
+        entities = [brand_analysis['brand_name'], *competitor_analysis]
+        types = ['brand'] + ['competitor'] * len(competitor_analysis)
+        analyses = [brand_analysis, *competitor_analysis.values()]
         
-        # Add platform-specific data
-        for platform, mentions in brand_analysis['platform_mentions'].items():
-            brand_data[f'{platform}_mentions'] = mentions
-        
-        data.append(brand_data)
-        
-        # Add competitor data
-        for competitor, comp_data in competitor_analysis.items():
-            comp_row = {
-                'entity': competitor,
-                'type': 'competitor',
-                'total_mentions': comp_data['total_mentions'],
-                'average_ranking': comp_data.get('average_ranking', 0)
-            }
-            
-            # Add platform-specific data
-            for platform, mentions in comp_data.get('platform_mentions', {}).items():
-                comp_row[f'{platform}_mentions'] = mentions
-            
-            data.append(comp_row)
+        # Platform columns in order of first appearance; an entity without a platform has 0 mentions there
+        platform_columns = {}
+        for row, analysis in enumerate(analyses):
+            for platform, mentions in analysis.get('platform_mentions', {}).items():
+                platform_columns.setdefault(platform, [0] * len(analyses))[row] = mentions
         
-        return pd.DataFrame(data)
+        return self._downcast(pd.DataFrame({
+            'entity': entities,
+            'type': pd.Categorical(types, categories=['brand', 'competitor']),
+            'total_mentions': np.array([analysis['total_mentions'] for analysis in analyses], dtype=np.int32),
+            # A missing ranking (None) becomes NaN
+            'average_ranking': np.array([analysis.get('average_ranking', 0) for analysis in analyses], dtype=float),
+            **{f'{platform}_mentions': np.array(column, dtype=np.int32) for platform, column in platform_columns.items()}
+        }))
     
     def calculate_competitive_metrics(self, brand_analysis: Dict[str, Any], 
                                     competitor_analysis: Dict[str, Any]) -> Dict[str, Any]:
@@ -110,41 +112,35 @@ class DataProcessor:
         
         # Market share calculation
         total_market_mentions = brand_mentions + sum(competitor_mentions.values())
-        
         if total_market_mentions > 0:
             metrics['market_share']['brand'] = brand_mentions / total_market_mentions
-            for competitor, mentions in competitor_mentions.items():
-                metrics['market_share'][competitor] = mentions / total_market_mentions
-        
-        # Competitive position
-        all_entities = [(brand_analysis['brand_name'], brand_mentions)]
-        all_entities.extend(competitor_mentions.items())
-        all_entities.sort(key=lambda x: x[1], reverse=True)
-        
-        for rank, (entity, mentions) in enumerate(all_entities, 1):
-            if entity == brand_analysis['brand_name']:
-                metrics['competitive_position']['rank'] = rank
-                metrics['competitive_position']['total_competitors'] = len(all_entities)
-                break
         
-        # Performance gaps
+        # Market share, rank and performance gaps per competitor in one pass;
+        # ties go to the brand, so only competitors strictly ahead push its rank down
+        rank = 1
         for competitor, mentions in competitor_mentions.items():
+            if total_market_mentions > 0:
+                metrics['market_share'][competitor] = mentions / total_market_mentions
+            if mentions > brand_mentions:
+                rank += 1
+            
             gap = mentions - brand_mentions
             metrics['performance_gaps'][competitor] = {
                 'mention_gap': gap,
                 'gap_percentage': (gap / brand_mentions * 100) if brand_mentions > 0 else 0
             }
         
-        # Identify opportunities
-        for platform in brand_analysis['platform_mentions']:
-            brand_platform_mentions = brand_analysis['platform_mentions'][platform]
-            competitor_platform_mentions = [
-                comp_data.get('platform_mentions', {}).get(platform, 0)
-                for comp_data in competitor_analysis.values()
-            ]
-            
-            if competitor_platform_mentions:
-                max_competitor_mentions = max(competitor_platform_mentions)
+        # Competitive position
+        metrics['competitive_position']['rank'] = rank
+        metrics['competitive_position']['total_competitors'] = len(competitor_mentions) + 1
+        
+        # Identify opportunities against the strongest competitor on each platform
+        competitor_platform_mentions = [
+            comp_data.get('platform_mentions', {}) for comp_data in competitor_analysis.values()
+        ]
+        if competitor_platform_mentions:
+            for platform, brand_platform_mentions in brand_analysis['platform_mentions'].items():
+                max_competitor_mentions = max(mentions.get(platform, 0) for mentions in competitor_platform_mentions)
                 if brand_platform_mentions < max_competitor_mentions * 0.7:
                     metrics['opportunities'].append({
                         'platform': platform,
@@ -158,23 +154,48 @@ class DataProcessor:
         """Generate time series data for tracking (placeholder for future implementation)"""
         # This would be used for tracking changes over time
         # For now, create a single data point
+        return self.generate_time_series_batch([analysis_data])
+    
+    def generate_time_series_batch(self, analysis_runs: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Time series of several analysis runs, one row each, built in a single DataFrame call"""
+        # Collect the rows first; growing a frame one run at a time copies it on every append.
+        # Rows built in the same call share one timestamp
+        timestamp = datetime.now()
+        return self._downcast(pd.DataFrame([
+            self._time_series_row(analysis_data, timestamp) for analysis_data in analysis_runs
+        ]))
+    
+    def _time_series_row(self, analysis_data: Dict[str, Any], timestamp: datetime) -> Dict[str, Any]:
+        """Flat time series data point of one analysis run"""
+        brand_analysis = analysis_data.get('brand_analysis', {})
         data = {
-            'timestamp': datetime.now(),
+            'timestamp': timestamp,
             'overall_score': analysis_data.get('visibility_score', {}).get('overall_score', 0),
-            'total_mentions': analysis_data.get('brand_analysis', {}).get('total_mentions', 0),
-            'average_ranking': analysis_data.get('brand_analysis', {}).get('average_ranking', 0)
+            'total_mentions': brand_analysis.get('total_mentions', 0),
+            'average_ranking': brand_analysis.get('average_ranking', 0)
         }
         
         # Add platform-specific data
-        platform_mentions = analysis_data.get('brand_analysis', {}).get('platform_mentions', {})
-        for platform, mentions in platform_mentions.items():
+        for platform, mentions in brand_analysis.get('platform_mentions', {}).items():
             data[f'{platform}_mentions'] = mentions
         
-        return pd.DataFrame([data])
+        return data
+    
+    def _downcast(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Shrink integer columns to the smallest dtype that holds their values"""
+        # Floats stay float64: scores like 46.1 would read back as 46.099998 from float32
+        for column in df.select_dtypes('integer'):
+            # Signed and no narrower than int16, so differences of counts and small sums can't wrap
+            downcast = pd.to_numeric(df[column], downcast='integer')
+            df[column] = downcast.astype(np.int16) if downcast.dtype.itemsize < 2 else downcast
+        return df
     
     def export_analysis_report(self, analysis_data: Dict[str, Any], 
                              brand_profile: Dict[str, Any]) -> Dict[str, Any]:
         """Export complete analysis report"""
+        brand_analysis = analysis_data.get('brand_analysis', {})
+        visibility_score = analysis_data.get('visibility_score', {})
+        
         report = {
             'metadata': {
                 'brand_name': brand_profile['brand_name'],
@@ -184,21 +205,30 @@ class DataProcessor:
                 'competitors_analyzed': brand_profile['competitors']
             },
             'executive_summary': {
-                'overall_score': analysis_data.get('visibility_score', {}).get('overall_score', 0),
-                'total_mentions': analysis_data.get('brand_analysis', {}).get('total_mentions', 0),
-                'market_position': self._calculate_market_position(analysis_data),
-                'key_findings': analysis_data.get('visibility_score', {}).get('insights', [])
+                'overall_score': visibility_score.get('overall_score', 0),
+                'total_mentions': brand_analysis.get('total_mentions', 0),
+                'market_position': self._calculate_market_position(visibility_score),
+                'key_findings': visibility_score.get('insights', [])
             },
             'detailed_analysis': {
-                'brand_analysis': analysis_data.get('brand_analysis', {}),
+                'brand_analysis': brand_analysis,
                 'competitor_analysis': analysis_data.get('competitor_analysis', {}),
-                'visibility_score': analysis_data.get('visibility_score', {})
+                'visibility_score': visibility_score
             },
-            'recommendations': analysis_data.get('visibility_score', {}).get('recommendations', [])
+            'recommendations': visibility_score.get('recommendations', [])
         }
         
         return report
     
+    def export_analysis_report_json(self, analysis_data: Dict[str, Any], 
+                                    brand_profile: Dict[str, Any]) -> bytes:
+        """Export complete analysis report as JSON bytes"""
+        # orjson writes the mention dataclasses and NumPy values directly, without a to-dict pass
+        return orjson.dumps(
+            self.export_analysis_report(analysis_data, brand_profile),
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    
     def _calculate_platform_performance_score(self, platform_details: Dict[str, Any]) -> float:
         """Calculate performance score for a platform"""
         mentions = platform_details.get('mentions', 0)
@@ -211,19 +241,14 @@ class DataProcessor:
         # Ranking bonus (lower ranking = higher bonus)
         ranking_bonus = 0
         if avg_ranking:
-            if avg_ranking <= 2:
-                ranking_bonus = 20
-            elif avg_ranking <= 3:
-                ranking_bonus = 10
-            elif avg_ranking <= 5:
-                ranking_bonus = 5
+            ranking_bonus = RANKING_BONUSES[bisect.bisect_left(RANKING_BONUS_BOUNDS, avg_ranking)]
         
         total_score = min(100, base_score + ranking_bonus)
         return round(total_score, 1)
     
-    def _calculate_market_position(self, analysis_data: Dict[str, Any]) -> str:
-        """Calculate market position description"""
-        score = analysis_data.get('visibility_score', {}).get('overall_score', 0)
+    def _calculate_market_position(self, visibility_score: Dict[str, Any]) -> str:
+        """Calculate market position description from the report's visibility score section"""
+        score = visibility_score.get('overall_score', 0)
         
         if score >= 80:
             return "Market Leader"
@@ -239,8 +264,9 @@ class DataProcessor:
         """Calculate trend analysis (placeholder for future implementation)"""
         # This would compare current data with historical data
         # For now, return current metrics
+        visibility_score = current_data.get('visibility_score', {})
         return {
-            'current_score': current_data.get('visibility_score', {}).get('overall_score', 0),
+            'current_score': visibility_score.get('overall_score', 0),
             'trend': 'stable',  # Would be calculated from historical data
             'growth_rate': 0.0,  # Would be calculated from historical data
             'insights': ['Baseline analysis completed - historical tracking will begin']
@@ -1,53 +1,148 @@
 import re
-from typing import List, Dict, Any, Optional
+import functools
+import itertools
+from typing import List, Dict, Any, Optional, Tuple
 import spacy
 
+# Keywords for the simple keyword-matching sentiment analysis
+POSITIVE_KEYWORDS = (
+    'best', 'excellent', 'great', 'amazing', 'outstanding', 'superior',
+    'top', 'leading', 'recommended', 'popular', 'reliable', 'trusted',
+    'innovative', 'effective', 'efficient', 'quality', 'premium',
+    'love', 'like', 'prefer', 'choose', 'select', 'winner'
+)
+
+NEGATIVE_KEYWORDS = (
+    'worst', 'terrible', 'bad', 'awful', 'poor', 'inferior',
+    'avoid', 'problem', 'issue', 'complaint', 'expensive',
+    'slow', 'difficult', 'complicated', 'limited', 'lacking',
+    'hate', 'dislike', 'disappointed', 'frustrating', 'annoying'
+)
+
+# Characters either side of a brand mention scanned for sentiment keywords
+SENTIMENT_CONTEXT_SIZE = 100
+
+# Numbered list items ("1. Brand ...") and ranking words, each with the rank it implies
+NUMBERED_LIST_PATTERN = re.compile(r'(\d+)\.\s*([^\n]+)')
+RANKING_WORDS = {
+    'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5,
+    'top': 1, 'best': 1, 'leading': 1, 'primary': 1
+}
+RANKING_WORD_PATTERNS = tuple(
+    (rank, re.compile(rf'\b{word}\b[^.]*?([A-Z][a-zA-Z\s]+)', re.IGNORECASE))
+    for word, rank in RANKING_WORDS.items()
+)
+# One group per ranking word, in RANKING_WORD_PATTERNS order, to see which words occur at all
+RANKING_WORD_PRESENCE_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(f'({word})' for word in RANKING_WORDS) + r')\b', re.IGNORECASE
+)
+
+# Phrases that introduce a comparison
+COMPARISON_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(compared to|vs|versus|against)[\s\w]+',
+    r'(better than|worse than|superior to|inferior to)[\s\w]+',
+    r'(while|whereas|unlike|in contrast to)[\s\w]+',
+    r'(alternatives to|competitors of|similar to)[\s\w]+'
+))
+
+# Fallback entity patterns for when the spaCy model isn't available
+COMPANY_PATTERNS = (
+    re.compile(r'\b[A-Z][a-zA-Z]+\s+(?:Inc|Corp|Ltd|LLC|Company|Co)\b'),
+    re.compile(r'\b[A-Z][a-zA-Z]+(?:Inc|Corp|Ltd|LLC)\b')
+)
+PRODUCT_PATTERNS = (
+    re.compile(r'\b[A-Z][a-zA-Z]+[A-Z][a-zA-Z]*\b'),  # CamelCase words
+)
+CAPITALIZED_PHRASE_PATTERN = re.compile(r'\b[A-Z][a-zA-Z\s]+\b')
+
+# Text cleanup: whitespace runs, and special characters other than basic punctuation
+WHITESPACE_PATTERN = re.compile(r'\s+')
+SPECIAL_CHAR_PATTERN = re.compile(r'[^\w\s\.\,\!\?\-\(\)]')
+
+@functools.lru_cache(maxsize=256)
+def brand_variations(brand_name: str, include_unspaced: bool = True) -> Tuple[str, ...]:
+    """Variations of a brand name, computed once per brand
+    
+    Sentiment matches the name with its spaces removed as well; mention counting in
+    BrandAnalyzer never has, so it asks for the set without it (include_unspaced=False).
+    """
+    variations = []
+    
+    # Add spaces in camelCase
+    spaced = re.sub(r'([a-z])([A-Z])', r'\1 \2', brand_name)
+    if spaced != brand_name:
+        variations.append(spaced)
+    
+    # Remove spaces
+    if include_unspaced:
+        no_spaces = brand_name.replace(' ', '')
+        if no_spaces != brand_name:
+            variations.append(no_spaces)
+    
+    # Abbreviations
+    words = brand_name.split()
+    if len(words) > 1:
+        abbreviation = ''.join(word[0].upper() for word in words)
+        variations.append(abbreviation)
+    
+    return tuple(variations)
+
+@functools.lru_cache(maxsize=256)
+def _compile_brand_patterns(brand_name: str) -> Tuple[re.Pattern, ...]:
+    """One case-insensitive pattern per name (the brand, then each variation), compiled once per brand"""
+    # Scanned separately rather than as one alternation: a variation inside a longer name
+    # (e.g. an abbreviation) is still a mention of its own, and counts toward sentiment
+    return tuple(
+        re.compile(re.escape(name), re.IGNORECASE)
+        for name in (brand_name, *brand_variations(brand_name))
+    )
+
 class NLPProcessor:
     """Natural Language Processing utilities for brand analysis"""
     
     def __init__(self):
         try:
-            # Try to load spaCy model
-            self.nlp = spacy.load("en_core_web_sm")
+            # Try to load spaCy model; entities and noun chunks never read lemmas, so skip the lemmatizer
+            self.nlp = spacy.load("en_core_web_sm", exclude=["lemmatizer"])
         except OSError:
             # Fallback to None if spaCy model not available
             self.nlp = None
+        
+        # (text, brand) -> label; re-running an analysis over cached responses scores the same pairs again
+        self._cached_sentiment = functools.lru_cache(maxsize=8192)(self._text_sentiment)
     
     def analyze_sentiment(self, text: str, brand_name: str) -> str:
         """Analyze sentiment of text related to the brand"""
-        # Find brand mentions in the text
-        brand_mentions = self._find_brand_mentions(text, brand_name)
-        
-        if not brand_mentions:
-            return 'neutral'
-        
-        # Simple sentiment analysis using keyword matching
-        positive_keywords = [
-            'best', 'excellent', 'great', 'amazing', 'outstanding', 'superior',
-            'top', 'leading', 'recommended', 'popular', 'reliable', 'trusted',
-            'innovative', 'effective', 'efficient', 'quality', 'premium',
-            'love', 'like', 'prefer', 'choose', 'select', 'winner'
-        ]
-        
-        negative_keywords = [
-            'worst', 'terrible', 'bad', 'awful', 'poor', 'inferior',
-            'avoid', 'problem', 'issue', 'complaint', 'expensive',
-            'slow', 'difficult', 'complicated', 'limited', 'lacking',
-            'hate', 'dislike', 'disappointed', 'frustrating', 'annoying'
-        ]
-        
-        # Analyze context around brand mentions
+        return self._cached_sentiment(text, brand_name)
+    
+    def analyze_sentiment_batch(self, texts: List[str], brand_name: str) -> List[str]:
+        """Analyze sentiment of several texts related to the same brand"""
+        return [self._cached_sentiment(text, brand_name) for text in texts]
+    
+    def _text_sentiment(self, text: str, brand_name: str) -> str:
+        """Uncached sentiment of one text for one brand"""
+        return self._score_sentiment(text, text.lower(), self._find_brand_mentions(text, brand_name))
+    
+    def _score_sentiment(self, text: str, text_lower: str, mentions: List[str]) -> str:
+        """Keyword sentiment of the context around each brand mention in one text"""
+        # Each mention is scored on the context of the first occurrence of its text, so
+        # repeated mentions share a score that only needs to be computed once
+        mention_scores = {}
         sentiment_score = 0
         
-        for mention in brand_mentions:
-            context = self._get_context_around_mention(text, mention)
-            context_lower = context.lower()
-            
-            # Count positive and negative words
-            positive_count = sum(1 for word in positive_keywords if word in context_lower)
-            negative_count = sum(1 for word in negative_keywords if word in context_lower)
+        for mention in mentions:
+            mention_lower = mention.lower()
+            if mention_lower not in mention_scores:
+                context = self._get_context_around_mention(text, mention, SENTIMENT_CONTEXT_SIZE, text_lower)
+                context_lower = context.lower()
+                
+                # Count positive and negative words
+                positive_count = sum(1 for word in POSITIVE_KEYWORDS if word in context_lower)
+                negative_count = sum(1 for word in NEGATIVE_KEYWORDS if word in context_lower)
+                
+                mention_scores[mention_lower] = positive_count - negative_count
             
-            sentiment_score += positive_count - negative_count
+            sentiment_score += mention_scores[mention_lower]
         
         # Determine overall sentiment
         if sentiment_score > 0:
@@ -59,49 +154,50 @@ class NLPProcessor:
     
     def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """Extract named entities from text"""
-        entities = []
+        if self.nlp:
+            return self._doc_entities(self.nlp(text))
         
+        # Fallback entity extraction using patterns
+        return self._extract_entities_fallback(text)
+    
+    def extract_entities_batch(self, texts: List[str], batch_size: int = 64) -> List[List[Dict[str, Any]]]:
+        """Extract named entities from several texts, streaming them through spaCy in batches"""
         if self.nlp:
-            doc = self.nlp(text)
-            for ent in doc.ents:
-                entities.append({
-                    'text': ent.text,
-                    'label': ent.label_,
-                    'start': ent.start_char,
-                    'end': ent.end_char
-                })
-        else:
-            # Fallback entity extraction using patterns
-            entities = self._extract_entities_fallback(text)
+            return [self._doc_entities(doc) for doc in self.nlp.pipe(texts, batch_size=batch_size)]
         
-        return entities
+        return [self._extract_entities_fallback(text) for text in texts]
+    
+    def _doc_entities(self, doc) -> List[Dict[str, Any]]:
+        """Named entities of a parsed spaCy doc"""
+        return [
+            {
+                'text': ent.text,
+                'label': ent.label_,
+                'start': ent.start_char,
+                'end': ent.end_char
+            }
+            for ent in doc.ents
+        ]
     
     def extract_rankings(self, text: str) -> List[Dict[str, Any]]:
         """Extract ranking information from text"""
         rankings = []
         
         # Pattern for numbered lists
-        numbered_pattern = r'(\d+)\.\s*([^\n]+)'
-        matches = re.findall(numbered_pattern, text)
-        
-        for rank, content in matches:
+        for rank, content in NUMBERED_LIST_PATTERN.findall(text):
             rankings.append({
                 'rank': int(rank),
                 'content': content.strip(),
                 'type': 'numbered_list'
             })
         
-        # Pattern for ranking words
-        ranking_words = {
-            'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5,
-            'top': 1, 'best': 1, 'leading': 1, 'primary': 1
-        }
-        
-        for word, rank in ranking_words.items():
-            pattern = rf'\b{word}\b[^.]*?([A-Z][a-zA-Z\s]+)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            
-            for match in matches:
+        # Pattern for ranking words; one scan finds which words occur, so absent ones are skipped.
+        # Matches of one word can run past another, so each present word still gets its own pass
+        present = {match.lastindex - 1 for match in RANKING_WORD_PRESENCE_PATTERN.finditer(text)}
+        for index, (rank, pattern) in enumerate(RANKING_WORD_PATTERNS):
+            if index not in present:
+                continue
+            for match in pattern.findall(text):
                 rankings.append({
                     'rank': rank,
                     'content': match.strip(),
@@ -114,17 +210,8 @@ class NLPProcessor:
         """Identify comparison contexts in text"""
         comparisons = []
         
-        # Comparison patterns
-        comparison_patterns = [
-            r'(compared to|vs|versus|against)[\s\w]+',
-            r'(better than|worse than|superior to|inferior to)[\s\w]+',
-            r'(while|whereas|unlike|in contrast to)[\s\w]+',
-            r'(alternatives to|competitors of|similar to)[\s\w]+'
-        ]
-        
-        for pattern in comparison_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in COMPARISON_PATTERNS:
+            for match in pattern.finditer(text):
                 comparisons.append({
                     'type': 'comparison',
                     'text': match.group(),
@@ -136,47 +223,18 @@ class NLPProcessor:
     
     def _find_brand_mentions(self, text: str, brand_name: str) -> List[str]:
         """Find all mentions of the brand in text"""
-        mentions = []
-        
-        # Direct mentions
-        brand_pattern = re.compile(re.escape(brand_name), re.IGNORECASE)
-        direct_matches = brand_pattern.findall(text)
-        mentions.extend(direct_matches)
-        
-        # Brand variations
-        variations = self._generate_brand_variations(brand_name)
-        for variation in variations:
-            var_pattern = re.compile(re.escape(variation), re.IGNORECASE)
-            var_matches = var_pattern.findall(text)
-            mentions.extend(var_matches)
-        
-        return mentions
+        return [mention for pattern in _compile_brand_patterns(brand_name) for mention in pattern.findall(text)]
     
     def _generate_brand_variations(self, brand_name: str) -> List[str]:
         """Generate variations of the brand name"""
-        variations = []
-        
-        # Add spaces in camelCase
-        spaced = re.sub(r'([a-z])([A-Z])', r'\1 \2', brand_name)
-        if spaced != brand_name:
-            variations.append(spaced)
-        
-        # Remove spaces
-        no_spaces = brand_name.replace(' ', '')
-        if no_spaces != brand_name:
-            variations.append(no_spaces)
-        
-        # Abbreviations
-        words = brand_name.split()
-        if len(words) > 1:
-            abbreviation = ''.join(word[0].upper() for word in words)
-            variations.append(abbreviation)
-        
-        return variations
+        return list(brand_variations(brand_name))
     
-    def _get_context_around_mention(self, text: str, mention: str, context_size: int = 100) -> str:
+    def _get_context_around_mention(self, text: str, mention: str, context_size: int = 100,
+                                    text_lower: Optional[str] = None) -> str:
         """Get context around a brand mention"""
-        mention_index = text.lower().find(mention.lower())
+        if text_lower is None:
+            text_lower = text.lower()
+        mention_index = text_lower.find(mention.lower())
         
         if mention_index == -1:
             return ""
@@ -191,14 +249,8 @@ class NLPProcessor:
         entities = []
         
         # Company patterns
-        company_patterns = [
-            r'\b[A-Z][a-zA-Z]+\s+(?:Inc|Corp|Ltd|LLC|Company|Co)\b',
-            r'\b[A-Z][a-zA-Z]+(?:Inc|Corp|Ltd|LLC)\b'
-        ]
-        
-        for pattern in company_patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+        for pattern in COMPANY_PATTERNS:
+            for match in pattern.finditer(text):
                 entities.append({
                     'text': match.group(),
                     'label': 'ORG',
@@ -207,13 +259,8 @@ class NLPProcessor:
                 })
         
         # Product patterns
-        product_patterns = [
-            r'\b[A-Z][a-zA-Z]+[A-Z][a-zA-Z]*\b',  # CamelCase words
-        ]
-        
-        for pattern in product_patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
+        for pattern in PRODUCT_PATTERNS:
+            for match in pattern.finditer(text):
                 entities.append({
                     'text': match.group(),
                     'label': 'PRODUCT',
@@ -226,10 +273,10 @@ class NLPProcessor:
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = WHITESPACE_PATTERN.sub(' ', text)
         
         # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s\.\,\!\?\-\(\)]', '', text)
+        text = SPECIAL_CHAR_PATTERN.sub('', text)
         
         # Strip leading/trailing whitespace
         text = text.strip()
@@ -238,19 +285,21 @@ class NLPProcessor:
     
     def extract_key_phrases(self, text: str, max_phrases: int = 10) -> List[str]:
         """Extract key phrases from text"""
+        # Phrases are produced lazily, so matching stops once max_phrases have passed the filter
         if self.nlp:
             doc = self.nlp(text)
             # Extract noun phrases
-            phrases = [chunk.text for chunk in doc.noun_chunks]
+            phrases = (chunk.text for chunk in doc.noun_chunks)
         else:
             # Fallback: extract capitalized phrases
-            phrases = re.findall(r'\b[A-Z][a-zA-Z\s]+\b', text)
+            phrases = (match.group() for match in CAPITALIZED_PHRASE_PATTERN.finditer(text))
         
         # Filter and limit phrases
-        filtered_phrases = []
-        for phrase in phrases:
-            phrase = phrase.strip()
-            if len(phrase) > 3 and len(phrase) < 50:
-                filtered_phrases.append(phrase)
-        
-        return filtered_phrases[:max_phrases]
+        stripped_phrases = (phrase.strip() for phrase in phrases)
+        filtered_phrases = (phrase for phrase in stripped_phrases if 3 < len(phrase) < 50)
+        return list(itertools.islice(filtered_phrases, max_phrases))
+
+@functools.cache
+def get_nlp_processor() -> NLPProcessor:
+    """Shared NLPProcessor, so the spaCy model is loaded once per process"""
+    return NLPProcessor()
@@ -0,0 +1,52 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# Default location of the on-disk response store, next to Streamlit's own cache
+RESPONSE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".streamlit", "cache", "responses.sqlite3")
+
+# Seconds a stored response is served before it is fetched again
+RESPONSE_CACHE_TTL = 7 * 86400
+
+class ResponseCache:
+    """(platform, prompt) -> response store on disk, so paid API calls survive server restarts"""
+    
+    def __init__(self, path: str = RESPONSE_CACHE_PATH, ttl: float = RESPONSE_CACHE_TTL):
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        
+        # Shared by every session's script thread, so access is serialized with a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "platform TEXT NOT NULL, prompt TEXT NOT NULL, response TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, PRIMARY KEY (platform, prompt))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)")
+        self.purge_expired()
+    
+    def get(self, platform: str, prompt: str) -> Optional[str]:
+        """Return the stored response for a (platform, prompt) pair, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE platform = ? AND prompt = ? AND stored_at > ?",
+                (platform, prompt, time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def put(self, platform: str, prompt: str, response: str) -> None:
+        """Store a response, replacing any older one for the same pair"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (platform, prompt, response, stored_at) VALUES (?, ?, ?, ?)",
+                (platform, prompt, response, time.time())
+            )
+    
+    def purge_expired(self) -> None:
+        """Delete responses past their ttl, so the file only holds what can still be served"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE stored_at <= ?", (time.time() - self.ttl,))